@@ -0,0 +1,73 @@
+"""
+토큰 추정 정확도 검증용 실측 usage 수집
+SAMPLE_REVIEWS 로 실제 OpenAI API 를 호출해 요청 메시지, 응답 텍스트, usage 를
+tests/fixtures/recorded_usage.jsonl 에 기록한다 (tests/test_token_budget.py 가 재생).
+
+실행: cd python && OPENAI_API_KEY=... python capture_usage.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+from openai import AsyncOpenAI
+
+from load_test import SAMPLE_REVIEWS
+from services.ai_reply_generator import AIReplyGenerator
+from services.sentiment_analyzer import SentimentAnalyzer
+
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "tests", "fixtures", "recorded_usage.jsonl")
+
+
+async def capture(output: str):
+    client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+    analyzer = SentimentAnalyzer(None, openai_client=client)
+    generator = AIReplyGenerator(None, openai_client=client)
+    records = []
+
+    for review in SAMPLE_REVIEWS:
+        quick_result = analyzer._quick_sentiment_analysis(review)
+        topic_result = analyzer._extract_topics_and_keywords(review)
+        analysis = analyzer._build_fallback_analysis(review, quick_result, topic_result)
+
+        requests = [
+            ("sentiment_analysis", analyzer._build_deep_messages(review), {"response_format": {"type": "json_object"}}),
+            ("reply_generation", generator._build_messages(review, analysis, "카페"), {})
+        ]
+        for kind, messages, extra in requests:
+            response = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=800,
+                **extra
+            )
+            records.append({
+                "kind": kind,
+                "messages": messages,
+                "completion": response.choices[0].message.content,
+                "usage": {
+                    "prompt_tokens": response.usage.prompt_tokens,
+                    "completion_tokens": response.usage.completion_tokens
+                }
+            })
+
+    await client.close()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"{len(records)}건 기록: {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI usage 실측값 수집")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    asyncio.run(capture(args.output))
+
+
+if __name__ == "__main__":
+    main()
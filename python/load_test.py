@@ -0,0 +1,252 @@
+"""
+FastAPI 서비스 부하 테스트
+로컬 OpenAI 대체 서버(고정 지연)를 띄우고 main:app 을 uvicorn 으로 실행한 뒤
+단건 / 배치(NDJSON) / SSE 스트리밍 엔드포인트의 처리량과 지연 분포를 측정
+
+실행: cd python && python load_test.py --requests 200 --concurrency 20 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+STUB_ANALYSIS = {
+    "sentiment": "negative",
+    "sentiment_strength": 0.8,
+    "topics": ["서비스", "대기시간"],
+    "keywords": ["불친절", "웨이팅"],
+    "intent": "불만",
+    "reply_focus": ["진심 어린 사과", "응대 교육 약속"],
+    "reply_avoid": ["변명"],
+    "summary": "직원 응대와 대기 시간 불만"
+}
+
+STUB_REPLY = "불편을 드려 정말 죄송합니다. 말씀해 주신 직원 응대와 대기 시간 문제는 바로 개선하겠습니다. 다음 방문 때는 더 나은 모습으로 찾아뵙겠습니다."
+
+SAMPLE_REVIEWS = [
+    "직원이 너무 불친절하고 웨이팅도 오래 걸렸어요. 음식은 괜찮았는데 실망입니다.",
+    "커피 맛있고 분위기 좋아요! 사장님도 친절하세요 최고",
+    "가격이 좀 비싼 편이지만 재료가 신선하고 맛있어서 만족합니다.",
+    "화장실이 지저분하고 테이블도 끈적거렸어요. 위생 관리 부탁드립니다."
+]
+
+
+def make_stub_handler(latency_ms: int):
+    """OpenAI chat.completions 대체 핸들러"""
+
+    class OpenAIStubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(latency_ms / 1000)
+
+            is_json = (body.get("response_format") or {}).get("type") == "json_object"
+            content = json.dumps(STUB_ANALYSIS, ensure_ascii=False) if is_json else STUB_REPLY
+
+            if body.get("stream"):
+                self._send_stream(content)
+            else:
+                self._send_completion(content)
+
+        def _send_completion(self, content: str):
+            payload = json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o-mini",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 300, "completion_tokens": 120, "total_tokens": 420}
+            }, ensure_ascii=False).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_stream(self, content: str):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+
+            for i in range(0, len(content), 8):
+                chunk = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": "gpt-4o-mini",
+                    "choices": [{"index": 0, "delta": {"content": content[i:i + 8]}, "finish_reason": None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return OpenAIStubHandler
+
+
+def start_openai_stub(port: int, latency_ms: int) -> ThreadingHTTPServer:
+    """OpenAI 대체 서버를 백그라운드 스레드로 실행"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_stub_handler(latency_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_app(port: int):
+    """main:app 을 백그라운드 스레드에서 uvicorn 으로 실행"""
+    import uvicorn
+
+    config = uvicorn.Config("main:app", host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def summarize(name: str, latencies: List[float], errors: int, elapsed: float, items: int) -> Dict:
+    """지연 분포 요약"""
+    latencies = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "endpoint": name,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "items_per_sec": round(items / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(0.50), 1),
+        "p95_ms": round(percentile(0.95), 1),
+        "p99_ms": round(percentile(0.99), 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0
+    }
+
+
+async def run_load(base_url: str, token: str, requests: int, concurrency: int, batch_size: int) -> List[Dict]:
+    """엔드포인트별 부하 생성"""
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=60) as client:
+
+        async def single(i: int) -> float:
+            body = {"review_content": SAMPLE_REVIEWS[i % len(SAMPLE_REVIEWS)] + f" #{i}"}
+            response = await client.post("/api/reply/generate", json=body)
+            response.raise_for_status()
+            return 0.0
+
+        async def batch(i: int) -> float:
+            body = {"reviews": [
+                {"review_content": SAMPLE_REVIEWS[j % len(SAMPLE_REVIEWS)] + f" #{i}-{j}"}
+                for j in range(batch_size)
+            ]}
+            lines = 0
+            async with client.stream("POST", "/api/reply/batch", json=body) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        lines += 1
+            if lines != batch_size:
+                raise RuntimeError(f"batch returned {lines}/{batch_size}")
+            return 0.0
+
+        async def stream(i: int) -> float:
+            body = {"review_content": SAMPLE_REVIEWS[i % len(SAMPLE_REVIEWS)] + f" #{i}"}
+            first_delta = None
+            start = time.perf_counter()
+            async with client.stream("POST", "/api/reply/stream", json=body) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if first_delta is None and line == "event: delta":
+                        first_delta = time.perf_counter() - start
+            return first_delta or 0.0
+
+        for name, fn, total, items_per_call in (
+            ("generate", single, requests, 1),
+            ("batch", batch, max(1, requests // batch_size), batch_size),
+            ("stream", stream, requests, 1)
+        ):
+            latencies: List[float] = []
+            first_deltas: List[float] = []
+            errors = 0
+
+            async def call(i: int):
+                nonlocal errors
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        first_delta = await fn(i)
+                        latencies.append(time.perf_counter() - start)
+                        if first_delta:
+                            first_deltas.append(first_delta)
+                    except Exception as e:
+                        errors += 1
+                        print(f"{name} 요청 실패: {e}")
+
+            start = time.perf_counter()
+            await asyncio.gather(*(call(i) for i in range(total)))
+            elapsed = time.perf_counter() - start
+
+            summary = summarize(name, latencies, errors, elapsed, len(latencies) * items_per_call)
+            if first_deltas:
+                summary["first_delta_p50_ms"] = round(statistics.median(first_deltas) * 1000, 1)
+            results.append(summary)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FastAPI 서비스 부하 테스트 (로컬 OpenAI 대체 서버 사용)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=int, default=300, help="OpenAI 대체 서버 응답 지연")
+    parser.add_argument("--stub-port", type=int, default=8765)
+    parser.add_argument("--app-port", type=int, default=8766)
+    args = parser.parse_args()
+
+    # 앱 시작 전에 OpenAI 클라이언트가 대체 서버를 바라보도록 설정
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    from utils.auth import create_access_token
+
+    start_openai_stub(args.stub_port, args.latency_ms)
+    start_app(args.app_port)
+
+    token = create_access_token({"id": "00000000-0000-0000-0000-000000000000", "username": "loadtest"})
+    results = asyncio.run(run_load(
+        f"http://127.0.0.1:{args.app_port}",
+        token,
+        args.requests,
+        args.concurrency,
+        args.batch_size
+    ))
+
+    for summary in results:
+        print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+AI 리뷰 답글 FastAPI 서비스
+AIServiceV2 를 HTTP 로 노출 (단건 / 배치 NDJSON / SSE 스트리밍)
+
+실행: cd python && uvicorn main:app --host 0.0.0.0 --port 8000
+
+Supabase 호출은 동기 클라이언트를 쓰므로 utils.database.execute_async 로
+스레드 풀(DB_THREAD_POOL_SIZE)에서 실행한다. 동시에 진행되는 DB 왕복 수는
+이 풀 크기로 제한되므로 BATCH_CONCURRENCY × 워커 수보다 작게 잡지 않는다.
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Dict, List, Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from services.ai_service_v2 import AIServiceV2
+from services.cache_maintenance import CacheMaintenance
+from services.refinement_queue import SQLiteRefinementQueue, SupabaseRefinementQueue
+from utils.auth import verify_jwt_token
+from utils.database import get_supabase_client
+from utils.usage_tracker import check_quota, log_api_usage
+
+
+# 배치 요청 제한
+MAX_BATCH_SIZE = 50
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# 동기 Supabase / SQLite 호출을 실행할 스레드 수
+DB_THREAD_POOL_SIZE = int(os.getenv("DB_THREAD_POOL_SIZE", "32"))
+
+# AI 정밀 분석 지연 예산 (설정 시 헤지 요청 + 예산 초과 폴백)
+DEEP_ANALYSIS_BUDGET_MS = int(os.getenv("DEEP_ANALYSIS_BUDGET_MS", "0")) or None
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+
+# 백그라운드 보완 큐 ("sqlite" | "supabase", 미설정 시 비활성)
+REFINEMENT_QUEUE = os.getenv("REFINEMENT_QUEUE")
+REFINEMENT_QUEUE_PATH = os.getenv("REFINEMENT_QUEUE_PATH", "refinement_queue.db")
+REFINEMENT_QUEUE_MAX_SIZE = int(os.getenv("REFINEMENT_QUEUE_MAX_SIZE", "10000"))
+REFINEMENT_RATE_PER_MINUTE = int(os.getenv("REFINEMENT_RATE_PER_MINUTE", "60"))
+REFINEMENT_CONCURRENCY = int(os.getenv("REFINEMENT_CONCURRENCY", "2"))
+# 처리 중인 사용자 요청이 이 값 이하일 때만 보완 (계속 바빠도 REFINEMENT_MAX_IDLE_WAIT_SECONDS 마다 1건)
+REFINEMENT_IDLE_THRESHOLD = int(os.getenv("REFINEMENT_IDLE_THRESHOLD", "2"))
+REFINEMENT_MAX_IDLE_WAIT_SECONDS = float(os.getenv("REFINEMENT_MAX_IDLE_WAIT_SECONDS", "30"))
+DEFER_DEEP_ANALYSIS = os.getenv("DEFER_DEEP_ANALYSIS", "false").lower() == "true"
+
+# 감정 분석 캐시 유지보수 주기 (0 이면 비활성, cron 으로 python -m services.cache_maintenance 실행 시)
+CACHE_MAINTENANCE_INTERVAL_MINUTES = int(os.getenv("CACHE_MAINTENANCE_INTERVAL_MINUTES", "60"))
+CACHE_TTL_DAYS = int(os.getenv("CACHE_TTL_DAYS", "90"))
+CACHE_MAX_ROWS = int(os.getenv("CACHE_MAX_ROWS", "50000"))
+
+# 매장별 감정 집계 반영 주기 (트래픽이 적은 매장의 증분도 다른 워커에서 보이도록)
+AGGREGATE_FLUSH_INTERVAL_SECONDS = int(os.getenv("AGGREGATE_FLUSH_INTERVAL_SECONDS", "30"))
+
+
+async def _run_periodically(interval_seconds: float, job, name: str):
+    """앱 수명 동안 interval_seconds 마다 job 실행 (실패해도 다음 주기에 재시도)"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await job()
+        except Exception as e:
+            print(f"{name} 실패: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작 시 OpenAI/Supabase 클라이언트 생성 및 캐시 워밍업, 종료 시 정리"""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=DB_THREAD_POOL_SIZE, thread_name_prefix="db")
+    )
+
+    try:
+        supabase_client = get_supabase_client()
+    except ValueError as e:
+        print(f"Supabase 미설정, 캐시/이력 없이 실행: {e}")
+        supabase_client = None
+
+    refinement_queue = None
+    if REFINEMENT_QUEUE == "sqlite":
+        refinement_queue = SQLiteRefinementQueue(REFINEMENT_QUEUE_PATH, max_size=REFINEMENT_QUEUE_MAX_SIZE)
+    elif REFINEMENT_QUEUE == "supabase" and supabase_client:
+        refinement_queue = SupabaseRefinementQueue(supabase_client, max_size=REFINEMENT_QUEUE_MAX_SIZE)
+
+    ai_service = AIServiceV2(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        supabase_client=supabase_client,
+        latency_budget_ms=DEEP_ANALYSIS_BUDGET_MS,
+        hedge_percentile=HEDGE_PERCENTILE,
+        refinement_queue=refinement_queue,
+        defer_deep_analysis=DEFER_DEEP_ANALYSIS
+    )
+    await ai_service.warm_start()
+    ai_service.start_refinement_worker(
+        concurrency=REFINEMENT_CONCURRENCY,
+        rate_per_minute=REFINEMENT_RATE_PER_MINUTE,
+        idle_threshold=REFINEMENT_IDLE_THRESHOLD,
+        max_idle_wait=REFINEMENT_MAX_IDLE_WAIT_SECONDS
+    )
+    app.state.ai_service = ai_service
+
+    periodic_tasks = []
+    if supabase_client and AGGREGATE_FLUSH_INTERVAL_SECONDS:
+        periodic_tasks.append(asyncio.create_task(
+            _run_periodically(AGGREGATE_FLUSH_INTERVAL_SECONDS, ai_service.flush_aggregates, "감정 집계 반영")
+        ))
+    if supabase_client and CACHE_MAINTENANCE_INTERVAL_MINUTES:
+        maintenance = CacheMaintenance(supabase_client, ttl_days=CACHE_TTL_DAYS, max_rows=CACHE_MAX_ROWS)
+        periodic_tasks.append(asyncio.create_task(
+            _run_periodically(CACHE_MAINTENANCE_INTERVAL_MINUTES * 60, maintenance.run, "캐시 유지보수")
+        ))
+
+    yield
+
+    for task in periodic_tasks:
+        task.cancel()
+    await asyncio.gather(*periodic_tasks, return_exceptions=True)
+    await ai_service.aclose()
+    if refinement_queue:
+        refinement_queue.close()
+
+
+app = FastAPI(title="AI Review Reply API", lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"]
+)
+
+
+class ReplyRequest(BaseModel):
+    review_content: str = Field(..., min_length=1)
+    brand_context: str = "카페"
+
+
+class BatchReplyRequest(BaseModel):
+    reviews: List[ReplyRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+async def get_current_user(authorization: Optional[str] = Header(None)) -> Dict:
+    """JWT 토큰 검증"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="인증이 필요합니다.")
+
+    try:
+        return verify_jwt_token(authorization.split("Bearer ")[1])
+    except ValueError:
+        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
+
+
+def get_ai_service(request: Request) -> AIServiceV2:
+    """앱 수명 동안 공유되는 AI 서비스"""
+    return request.app.state.ai_service
+
+
+def _reply_options(review: ReplyRequest, user: Dict) -> Dict:
+    return {
+        "brand_context": review.brand_context,
+        "user_id": user.get("id"),
+        "save_to_db": True
+    }
+
+
+async def _enforce_quota(ai_service: AIServiceV2, user: Dict, reviews: List[ReplyRequest]):
+    """답글 수 한도 + 사전 계산한 예상 토큰(상한값)으로 쿼터 확인 (초과 시 429)"""
+    if not ai_service.supabase or not user.get("id"):
+        return
+
+    estimated_tokens = sum(
+        ai_service.estimate_request(review.review_content, _reply_options(review, user))["total_tokens"]
+        for review in reviews
+    )
+    quota = await asyncio.to_thread(
+        check_quota, ai_service.supabase, user["id"], estimated_tokens, len(reviews)
+    )
+    if not quota["allowed"]:
+        raise HTTPException(status_code=429, detail=quota["reason"])
+
+
+async def _log_usage(ai_service: AIServiceV2, user: Dict, endpoint: str, result: Dict, started: float):
+    """실제 토큰 사용량을 api_usage_logs 에 기록"""
+    if not ai_service.supabase or not user.get("id"):
+        return
+
+    await asyncio.to_thread(
+        log_api_usage,
+        ai_service.supabase,
+        user["id"],
+        endpoint,
+        result,
+        int((time.perf_counter() - started) * 1000),
+        result.get("error")
+    )
+
+
+@app.get("/api/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/api/metrics/slo")
+async def slo_metrics(
+    user: Dict = Depends(get_current_user),
+    ai_service: AIServiceV2 = Depends(get_ai_service)
+):
+    """헤지 요청 / 지연 예산 초과 폴백 발생 통계"""
+    return ai_service.sentiment_analyzer.get_slo_metrics()
+
+
+@app.get("/api/metrics/tokens")
+async def token_metrics(
+    user: Dict = Depends(get_current_user),
+    ai_service: AIServiceV2 = Depends(get_ai_service)
+):
+    """토큰 추정치 vs 실측 usage 정확도"""
+    return ai_service.get_token_accuracy()
+
+
+@app.get("/api/summary")
+async def store_summary(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user: Dict = Depends(get_current_user),
+    ai_service: AIServiceV2 = Depends(get_ai_service)
+):
+    """매장별 감정/주제/이슈 집계 (기본 최근 30일)"""
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="시작일이 종료일보다 늦습니다.")
+
+    try:
+        return await ai_service.get_store_summary(user["id"], start, end)
+    except Exception as e:
+        print(f"감정 집계 조회 실패: {e}")
+        raise HTTPException(status_code=503, detail="감정 집계를 조회할 수 없습니다.")
+
+
+@app.post("/api/reply/generate")
+async def generate_reply(
+    review: ReplyRequest,
+    user: Dict = Depends(get_current_user),
+    ai_service: AIServiceV2 = Depends(get_ai_service)
+):
+    """답글 생성 (감정 분석 + 답글 생성)"""
+    await _enforce_quota(ai_service, user, [review])
+
+    started = time.perf_counter()
+    result = await ai_service.generate_reply(review.review_content, _reply_options(review, user))
+    await _log_usage(ai_service, user, "/api/reply/generate", result, started)
+
+    if not result.get("success"):
+        raise HTTPException(status_code=500, detail=result.get("error", "답글 생성 실패"))
+
+    return result
+
+
+@app.post("/api/reply/batch")
+async def generate_reply_batch(
+    batch: BatchReplyRequest,
+    user: Dict = Depends(get_current_user),
+    ai_service: AIServiceV2 = Depends(get_ai_service)
+):
+    """
+    배치 답글 생성
+
+    완료되는 순서대로 한 줄씩 NDJSON 으로 응답하며,
+    각 줄의 index 는 요청 reviews 배열의 위치이다.
+    """
+    await _enforce_quota(ai_service, user, batch.reviews)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(index: int, review: ReplyRequest) -> Dict:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await ai_service.generate_reply(review.review_content, _reply_options(review, user))
+        await _log_usage(ai_service, user, "/api/reply/batch", result, started)
+        return {"index": index, **result}
+
+    async def ndjson():
+        tasks = [asyncio.create_task(run(i, review)) for i, review in enumerate(batch.reviews)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            # 클라이언트가 연결을 끊으면 남은 작업 취소
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/api/reply/stream")
+async def stream_reply(
+    review: ReplyRequest,
+    user: Dict = Depends(get_current_user),
+    ai_service: AIServiceV2 = Depends(get_ai_service)
+):
+    """답글 스트리밍 (Server-Sent Events: analysis → delta... → done)"""
+    await _enforce_quota(ai_service, user, [review])
+
+    async def sse():
+        started = time.perf_counter()
+        async for event in ai_service.stream_reply(review.review_content, _reply_options(review, user)):
+            event_type = event.pop("type")
+            if event_type == "done":
+                await _log_usage(ai_service, user, "/api/reply/stream", event, started)
+            yield f"event: {event_type}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -3,15 +3,25 @@ AI 기반 답글 생성 엔진
 감정 분석 결과를 기반으로 맥락에 맞는 고품질 답글 생성
 """
 
-from typing import Dict
-from openai import OpenAI
+from typing import AsyncIterator, Dict, List, Optional
+from openai import AsyncOpenAI
+
+from utils.token_budget import TokenEstimator, estimate_cost, truncate_to_budget
+
+
+# 답글 목표 길이 상한 (_validate_and_adjust_reply 기준과 동일)
+MAX_REPLY_CHARS = 150
+
+# 답글 프롬프트에 인용하는 리뷰 최대 토큰
+MAX_REVIEW_TOKENS = 400
 
 
 class AIReplyGenerator:
     """답글 생성 엔진"""
 
-    def __init__(self, openai_api_key: str):
-        self.client = OpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str, openai_client: Optional[AsyncOpenAI] = None):
+        self.client = openai_client or AsyncOpenAI(api_key=openai_api_key)
+        self.token_estimator = TokenEstimator("gpt-4o-mini")
 
     async def generate_reply(
         self,
@@ -20,31 +30,29 @@ class AIReplyGenerator:
         brand_context: str = "카페"
     ) -> Dict:
         """답글 생성"""
-
-        # 감정별 시스템 프롬프트
-        system_prompt = self._get_system_prompt(analysis_result["sentiment"])
-
-        # 고도화 프롬프트 구성
-        user_prompt = self._build_user_prompt(
-            review_content,
-            analysis_result,
-            brand_context
-        )
+        messages = self._build_messages(review_content, analysis_result, brand_context)
+        max_tokens = self._reply_max_tokens()
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
-                max_tokens=250,
+                max_tokens=max_tokens,
                 presence_penalty=0.4,
                 frequency_penalty=0.3
             )
 
             generated_reply = response.choices[0].message.content.strip()
+            self.token_estimator.record_usage(messages, response.usage, generated_reply)
+
+            if response.usage:
+                prompt_tokens = response.usage.prompt_tokens
+                completion_tokens = response.usage.completion_tokens
+            else:
+                estimated = self.token_estimator.estimate_usage(messages, generated_reply)
+                prompt_tokens = estimated["prompt_tokens"]
+                completion_tokens = estimated["completion_tokens"]
 
             # 답글 검증
             validated_reply = self._validate_and_adjust_reply(
@@ -56,7 +64,10 @@ class AIReplyGenerator:
                 "success": True,
                 "reply": validated_reply,
                 "model_used": "gpt-4o-mini",
-                "tokens_used": response.usage.total_tokens if response.usage else 0
+                "tokens_used": prompt_tokens + completion_tokens,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "estimated_cost": estimate_cost("gpt-4o-mini", prompt_tokens, completion_tokens)
             }
 
         except Exception as e:
@@ -71,9 +82,113 @@ class AIReplyGenerator:
                 "success": True,
                 "reply": fallback_reply,
                 "model_used": "template",
-                "tokens_used": 0
+                "tokens_used": 0,
+                "estimated_cost": 0.0
             }
 
+    async def stream_reply(
+        self,
+        review_content: str,
+        analysis_result: Dict,
+        brand_context: str = "카페"
+    ) -> AsyncIterator[Dict]:
+        """
+        답글 스트리밍 생성
+
+        {"type": "delta", "text": "..."} 를 순서대로 내보낸 뒤
+        검증/후처리된 최종 답글을 {"type": "done", ...} 로 내보낸다.
+        """
+        messages = self._build_messages(review_content, analysis_result, brand_context)
+        max_tokens = self._reply_max_tokens()
+        chunks: List[str] = []
+
+        try:
+            stream = await self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=max_tokens,
+                presence_penalty=0.4,
+                frequency_penalty=0.3,
+                stream=True
+            )
+
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    chunks.append(text)
+                    yield {"type": "delta", "text": text}
+
+            # 스트리밍 응답에는 usage 가 없으므로 실제 출력 텍스트로 추정
+            estimated = self.token_estimator.estimate_usage(messages, "".join(chunks))
+            prompt_tokens = estimated["prompt_tokens"]
+            completion_tokens = estimated["completion_tokens"]
+
+            yield {
+                "type": "done",
+                "success": True,
+                "reply": self._validate_and_adjust_reply("".join(chunks).strip(), analysis_result),
+                "model_used": "gpt-4o-mini",
+                "tokens_used": prompt_tokens + completion_tokens,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "estimated_cost": estimate_cost("gpt-4o-mini", prompt_tokens, completion_tokens)
+            }
+
+        except Exception as e:
+            print(f"답글 스트리밍 실패: {e}")
+            yield {
+                "type": "done",
+                "success": True,
+                "reply": self._generate_template_reply(
+                    analysis_result["sentiment"],
+                    analysis_result.get("topics", []),
+                    analysis_result.get("keywords", [])
+                ),
+                "model_used": "template",
+                "tokens_used": 0,
+                "estimated_cost": 0.0
+            }
+
+    def estimate_request(
+        self,
+        review_content: str,
+        analysis_result: Dict,
+        brand_context: str = "카페"
+    ) -> Dict:
+        """답글 생성 1회의 사전 비용 계산 (쿼터 확인용 상한값)"""
+        messages = self._build_messages(review_content, analysis_result, brand_context)
+        return self.token_estimator.estimate_request_cost(messages, self._reply_max_tokens())
+
+    def _build_messages(
+        self,
+        review_content: str,
+        analysis_result: Dict,
+        brand_context: str
+    ) -> List[Dict]:
+        """감정별 시스템 프롬프트 + 고도화 사용자 프롬프트"""
+        system_prompt = self._get_system_prompt(analysis_result["sentiment"])
+        user_prompt = self._build_user_prompt(
+            truncate_to_budget(review_content, MAX_REVIEW_TOKENS),
+            analysis_result,
+            brand_context
+        )
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _reply_max_tokens(self) -> int:
+        """답글은 150자 이내로 후처리되므로 그 이상 생성할 필요 없음"""
+        return self.token_estimator.estimate_completion_budget(
+            expected_chars=MAX_REPLY_CHARS,
+            minimum=120,
+            maximum=250
+        )
+
     def _get_system_prompt(self, sentiment: str) -> str:
         """감정별 시스템 프롬프트"""
         prompts = {
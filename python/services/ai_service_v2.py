@@ -3,18 +3,109 @@ AI 서비스 통합 인터페이스
 감정 분석 + 답글 생성을 하나의 API로 제공
 """
 
-from typing import Dict, Optional
+import asyncio
+from datetime import date
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+from openai import AsyncOpenAI
+from utils.database import execute_async
+from utils.usage_tracker import log_api_usage
 from .sentiment_analyzer import SentimentAnalyzer
 from .ai_reply_generator import AIReplyGenerator
+from .sentiment_aggregates import SentimentAggregator
+from .refinement_queue import RefinementWorker
 
 
 class AIServiceV2:
     """통합 AI 서비스"""
 
-    def __init__(self, openai_api_key: str, supabase_client=None):
-        self.sentiment_analyzer = SentimentAnalyzer(openai_api_key, supabase_client)
-        self.reply_generator = AIReplyGenerator(openai_api_key)
+    def __init__(
+        self,
+        openai_api_key: str,
+        supabase_client=None,
+        openai_client: Optional[AsyncOpenAI] = None,
+        latency_budget_ms: Optional[int] = None,
+        hedge_percentile: float = 0.9,
+        refinement_queue=None,
+        defer_deep_analysis: bool = False
+    ):
+        # 감정 분석과 답글 생성이 하나의 OpenAI 커넥션 풀을 공유
+        self.openai_client = openai_client or AsyncOpenAI(api_key=openai_api_key)
+        self.sentiment_analyzer = SentimentAnalyzer(
+            openai_api_key,
+            supabase_client,
+            self.openai_client,
+            latency_budget_ms=latency_budget_ms,
+            hedge_percentile=hedge_percentile,
+            refinement_queue=refinement_queue,
+            defer_deep_analysis=defer_deep_analysis,
+            on_background_usage=self._log_background_usage
+        )
+        self.reply_generator = AIReplyGenerator(openai_api_key, self.openai_client)
         self.supabase = supabase_client
+        self.aggregator = SentimentAggregator(supabase_client)
+        self.refinement_worker: Optional[RefinementWorker] = None
+
+    def start_refinement_worker(
+        self,
+        on_refined: Optional[Callable[[Dict, Dict], Awaitable]] = None,
+        **worker_options
+    ) -> Optional[RefinementWorker]:
+        """
+        보완 큐 워커 시작 (refinement_queue 가 설정된 경우)
+
+        Args:
+            on_refined: 보완 완료 시 호출 (job, analysis), job["meta"] 에 user_id 포함
+            worker_options: concurrency, rate_per_minute, idle_threshold, max_idle_wait, poll_interval, purge_interval
+        """
+        queue = self.sentiment_analyzer.refinement_queue
+        if queue is None:
+            return None
+
+        self.refinement_worker = RefinementWorker(
+            self.sentiment_analyzer,
+            queue,
+            on_refined=on_refined,
+            **worker_options
+        )
+        self.refinement_worker.start()
+        return self.refinement_worker
+
+    async def aclose(self):
+        """종료 시 보완 워커 / 백그라운드 보완 정리, 미반영 집계 저장 후 OpenAI 커넥션 풀 정리"""
+        if self.refinement_worker:
+            await self.refinement_worker.stop()
+        await self.sentiment_analyzer.aclose()
+        await self.aggregator.flush()
+        await self.openai_client.close()
+
+    async def _log_background_usage(self, meta: Optional[Dict], usage: Dict):
+        """백그라운드 보완 / 취소된 요청의 사용량을 api_usage_logs 에 기록 (요청 로그에 잡히지 않는 비용)"""
+        user_id = (meta or {}).get("user_id")
+        if not self.supabase or not user_id:
+            return
+
+        await asyncio.to_thread(
+            log_api_usage,
+            self.supabase,
+            user_id,
+            "background_refinement",
+            {
+                "success": True,
+                "model_used": "gpt-4o-mini",
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "tokens_used": usage.get("total_tokens", 0),
+                "estimated_cost": usage.get("estimated_cost", 0.0)
+            },
+            0,
+            api_type="sentiment_analysis"
+        )
+
+    async def warm_start(self, limit: Optional[int] = None) -> int:
+        """워커 부팅 시 자주 쓰는 감정 분석 캐시를 메모리에 적재"""
+        if limit is None:
+            return await self.sentiment_analyzer.warm_start()
+        return await self.sentiment_analyzer.warm_start(limit)
 
     async def generate_reply(
         self,
@@ -41,7 +132,9 @@ class AIServiceV2:
                 "topics": ["맛/품질", "서비스"],
                 "keywords": ["맛있", "친절"],
                 "analysis_time_ms": 842,
-                "reply_generation_time_ms": 534
+                "reply_generation_time_ms": 534,
+                "tokens_used": 1021,
+                "estimated_cost": 0.000312
             }
         """
         options = options or {}
@@ -49,7 +142,10 @@ class AIServiceV2:
 
         try:
             # 1. 감정 분석 (3단계 하이브리드)
-            analysis_result = await self.sentiment_analyzer.analyze(review_content)
+            analysis_result = await self.sentiment_analyzer.analyze(
+                review_content,
+                refinement_meta={"user_id": options.get("user_id")}
+            )
 
             if not analysis_result.get("success"):
                 return {
@@ -71,26 +167,15 @@ class AIServiceV2:
                 }
 
             # 3. 결과 통합
-            result = {
-                "success": True,
-                "reply": reply_result["reply"],
-                "sentiment": analysis_result["sentiment"],
-                "sentiment_strength": analysis_result["sentiment_strength"],
-                "topics": analysis_result["topics"],
-                "keywords": analysis_result["keywords"],
-                "intent": analysis_result.get("intent", "일반"),
-                "analysis_time_ms": analysis_result.get("analysis_time_ms", 0),
-                "analysis_source": analysis_result.get("analysis_source", "unknown"),
-                "model_used": reply_result.get("model_used", "unknown"),
-                "tokens_used": reply_result.get("tokens_used", 0)
-            }
+            result = self._build_result(analysis_result, reply_result)
 
-            # 4. DB 저장 (선택 사항)
+            # 4. DB 저장 (선택 사항) + 저장된 이력만 매장별 감정 집계에 반영
             if options.get("save_to_db") and self.supabase and options.get("user_id"):
                 await self._save_to_history(
                     user_id=options["user_id"],
                     review_content=review_content,
-                    result=result
+                    result=result,
+                    analysis_result=analysis_result
                 )
 
             return result
@@ -102,17 +187,150 @@ class AIServiceV2:
                 "error": str(e)
             }
 
+    async def stream_reply(
+        self,
+        review_content: str,
+        options: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        감정 분석 후 답글을 스트리밍 생성 (SSE 엔드포인트용)
+
+        Yields:
+            {"type": "analysis", "sentiment": ..., "topics": [...], ...}
+            {"type": "delta", "text": "..."} (여러 번)
+            {"type": "done", ...generate_reply 와 같은 결과}
+            실패 시 {"type": "error", "error": "..."}
+        """
+        options = options or {}
+        brand_context = options.get("brand_context", "카페")
+
+        try:
+            analysis_result = await self.sentiment_analyzer.analyze(
+                review_content,
+                refinement_meta={"user_id": options.get("user_id")}
+            )
+
+            if not analysis_result.get("success"):
+                yield {"type": "error", "error": "감정 분석 실패"}
+                return
+
+            yield {
+                "type": "analysis",
+                "sentiment": analysis_result["sentiment"],
+                "sentiment_strength": analysis_result["sentiment_strength"],
+                "topics": analysis_result["topics"],
+                "keywords": analysis_result["keywords"],
+                "intent": analysis_result.get("intent", "일반")
+            }
+
+            async for event in self.reply_generator.stream_reply(
+                review_content=review_content,
+                analysis_result=analysis_result,
+                brand_context=brand_context
+            ):
+                if event["type"] != "done":
+                    yield event
+                    continue
+
+                result = self._build_result(analysis_result, event)
+                if options.get("save_to_db") and self.supabase and options.get("user_id"):
+                    await self._save_to_history(
+                        user_id=options["user_id"],
+                        review_content=review_content,
+                        result=result,
+                        analysis_result=analysis_result
+                    )
+                yield {"type": "done", **result}
+
+        except Exception as e:
+            print(f"AI 서비스 스트리밍 오류: {e}")
+            yield {"type": "error", "error": str(e)}
+
+    def _build_result(self, analysis_result: Dict, reply_result: Dict) -> Dict:
+        """분석 + 답글 결과 통합 (토큰/비용 합산)"""
+        analysis_usage = analysis_result.get("usage", {})
+        return {
+            "success": True,
+            "reply": reply_result["reply"],
+            "sentiment": analysis_result["sentiment"],
+            "sentiment_strength": analysis_result["sentiment_strength"],
+            "topics": analysis_result["topics"],
+            "keywords": analysis_result["keywords"],
+            "intent": analysis_result.get("intent", "일반"),
+            "analysis_time_ms": analysis_result.get("analysis_time_ms", 0),
+            "analysis_source": analysis_result.get("analysis_source", "unknown"),
+            "model_used": reply_result.get("model_used", "unknown"),
+            "prompt_tokens": reply_result.get("prompt_tokens", 0) + analysis_usage.get("prompt_tokens", 0),
+            "completion_tokens": reply_result.get("completion_tokens", 0) + analysis_usage.get("completion_tokens", 0),
+            "tokens_used": reply_result.get("tokens_used", 0) + analysis_usage.get("total_tokens", 0),
+            "estimated_cost": reply_result.get("estimated_cost", 0.0) + analysis_usage.get("estimated_cost", 0.0)
+        }
+
+    def estimate_request(self, review_content: str, options: Optional[Dict] = None) -> Dict:
+        """
+        요청 1건의 사전 토큰/비용 계산 (쿼터 확인용 상한값)
+
+        AI 정밀 분석이 실행된다고 가정하고, 답글 프롬프트는 룰 기반 분석 결과로 구성한다.
+        """
+        options = options or {}
+        analyzer = self.sentiment_analyzer
+        quick_result = analyzer._quick_sentiment_analysis(review_content)
+        topic_result = analyzer._extract_topics_and_keywords(review_content)
+        preview = analyzer._build_fallback_analysis(review_content, quick_result, topic_result)
+
+        estimates = [self.reply_generator.estimate_request(
+            review_content,
+            preview,
+            options.get("brand_context", "카페")
+        )]
+        if analyzer.client:
+            estimates.append(analyzer.estimate_deep_request(review_content))
+
+        return {key: sum(estimate[key] for estimate in estimates) for key in estimates[0]}
+
+    def get_token_accuracy(self) -> Dict:
+        """토큰 추정치 vs 실측 usage 정확도 (감정 분석 / 답글 생성)"""
+        return {
+            "sentiment_analysis": self.sentiment_analyzer.token_estimator.accuracy(),
+            "reply_generation": self.reply_generator.token_estimator.accuracy()
+        }
+
+    async def get_store_summary(
+        self,
+        user_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict:
+        """매장별 감정/주제/이슈 집계 조회 (기본 최근 30일)"""
+        return await self.aggregator.get_summary(user_id, start, end)
+
+    async def flush_aggregates(self) -> int:
+        """미반영 집계를 summary 테이블에 즉시 반영 (주기 작업 / 종료 시 호출)"""
+        return await self.aggregator.flush()
+
+    async def _record_aggregate(self, user_id: str, review_content: str, analysis_result: Dict):
+        """집계 반영 후 배치 크기에 도달하면 flush"""
+        if "details" not in analysis_result:
+            # 캐시 결과에는 이슈 정보가 없으므로 룰 기반으로 보충
+            topic_result = self.sentiment_analyzer._extract_topics_and_keywords(review_content)
+            analysis_result = {**analysis_result, "details": {"issues": topic_result["issues"]}}
+
+        self.aggregator.record(user_id, analysis_result)
+        if self.aggregator.should_flush():
+            await self.aggregator.flush()
+
     async def _save_to_history(
         self,
         user_id: str,
         review_content: str,
-        result: Dict
+        result: Dict,
+        analysis_result: Dict
     ):
-        """이력 저장"""
+        """이력 저장 (성공한 경우에만 감정 집계 반영, summary 가 reply_history 와 일치)"""
         try:
             import json
 
-            self.supabase.table("reply_history").insert({
+            await execute_async(self.supabase.table("reply_history").insert({
                 "user_id": user_id,
                 "review_content": review_content,
                 "generated_reply": result["reply"],
@@ -120,6 +338,9 @@ class AIServiceV2:
                 "sentiment_strength": result["sentiment_strength"],
                 "topics": json.dumps(result["topics"]) if isinstance(result["topics"], list) else result["topics"],
                 "keywords": json.dumps(result["keywords"]) if isinstance(result["keywords"], list) else result["keywords"]
-            }).execute()
+            }))
         except Exception as e:
             print(f"이력 저장 실패: {e}")
+            return
+
+        await self._record_aggregate(user_id, review_content, analysis_result)
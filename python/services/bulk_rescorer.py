@@ -0,0 +1,276 @@
+"""
+룰 기반 일괄 재채점 (감정 사전 변경 후 reply_history 재분석용)
+1단계(감정)와 2단계(주제/키워드)만 사용하며 AI 호출 없음
+
+룰 단계는 순수 CPU 작업이라 GIL 에 묶이므로 프로세스 풀로 청크를 분산한다.
+각 워커는 시작 시 감정 사전을 한 번만 로드하고, 청크는 pickle 로 전달된다.
+결과 순서는 입력 순서와 같아 직렬 경로와 동일한 출력을 보장한다.
+
+재채점이 끝나면 sentiment_summary 도 재채점 결과로 매장별 재구성한다 (migration 016).
+재구성 중 들어온 새 답글의 증분은 덮어써질 수 있으므로 트래픽이 적은 시간에 실행한다.
+
+실행: cd python && python -m services.bulk_rescorer --workers 4
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .cache_maintenance import _parse_timestamp
+from .sentiment_aggregates import SentimentAggregator
+from .sentiment_analyzer import SentimentAnalyzer
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+# 워커 프로세스별 분석기 (initializer 에서 한 번만 생성)
+_worker_analyzer: Optional[SentimentAnalyzer] = None
+
+
+def _init_worker():
+    """워커 시작 시 감정 사전 로드"""
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer(openai_api_key=None)
+
+
+def _score_chunk(rows: List[Dict]) -> List[Dict]:
+    """워커에서 청크 하나 채점"""
+    return [score_row(_worker_analyzer, row) for row in rows]
+
+
+def score_row(analyzer: SentimentAnalyzer, row: Dict) -> Dict:
+    """reply_history 행 하나를 룰 기반으로 채점"""
+    content = row["review_content"]
+    quick_result = analyzer._quick_sentiment_analysis(content)
+    topic_result = analyzer._extract_topics_and_keywords(content)
+
+    return {
+        "id": row.get("id"),
+        "user_id": row.get("user_id"),
+        "created_at": row.get("created_at"),
+        "sentiment": quick_result["sentiment"],
+        "sentiment_strength": round(quick_result["confidence"], 2),
+        "topics": [t["topic"] for t in topic_result["topics"]],
+        "keywords": topic_result["keywords"],
+        "issues": topic_result["issues"]
+    }
+
+
+def iter_chunks(rows: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+    """행 스트림을 청크 단위로 분할"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def rescore_serial(rows: Iterable[Dict]) -> Iterator[Dict]:
+    """직렬 재채점 (기준 경로)"""
+    analyzer = SentimentAnalyzer(openai_api_key=None)
+    for row in rows:
+        yield score_row(analyzer, row)
+
+
+def rescore_parallel(
+    rows: Iterable[Dict],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict]:
+    """
+    프로세스 풀 병렬 재채점
+
+    동시에 처리 중인 청크를 워커 수의 2배로 제한하여
+    수백만 행도 메모리에 모두 올리지 않고 스트리밍한다.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for chunk in iter_chunks(rows, chunk_size):
+            pending.append(executor.submit(_score_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def benchmark(
+    rows: List[Dict],
+    worker_counts: Optional[List[int]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict:
+    """
+    코어 수별 처리량 측정 및 직렬 결과와의 일치 검증
+
+    Returns:
+        {
+            "rows": 100000,
+            "serial_rows_per_sec": 41000.0,
+            "parallel": [
+                {"workers": 2, "rows_per_sec": 78000.0, "speedup": 1.9, "identical": True},
+                ...
+            ]
+        }
+    """
+    worker_counts = worker_counts or _default_worker_counts()
+
+    start = time.perf_counter()
+    expected = list(rescore_serial(rows))
+    serial_elapsed = time.perf_counter() - start
+    serial_rate = len(rows) / serial_elapsed if serial_elapsed else 0.0
+
+    parallel = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        actual = list(rescore_parallel(rows, workers=workers, chunk_size=chunk_size))
+        elapsed = time.perf_counter() - start
+        rate = len(rows) / elapsed if elapsed else 0.0
+
+        parallel.append({
+            "workers": workers,
+            "rows_per_sec": round(rate, 1),
+            "speedup": round(rate / serial_rate, 2) if serial_rate else 0.0,
+            "identical": actual == expected
+        })
+
+    return {
+        "rows": len(rows),
+        "serial_rows_per_sec": round(serial_rate, 1),
+        "parallel": parallel
+    }
+
+
+def fetch_reply_history(supabase_client, page_size: int = 1000) -> Iterator[Dict]:
+    """reply_history 를 id 순 키셋 페이지로 스트리밍 조회 (깊은 페이지도 일정한 비용)"""
+    last_id = None
+    while True:
+        query = supabase_client.table("reply_history").select("id, user_id, review_content, created_at")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        result = query.order("id").limit(page_size).execute()
+
+        page = result.data or []
+        yield from page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+
+def rescore_reply_history(
+    supabase_client,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dry_run: bool = False
+) -> Dict:
+    """reply_history 전체 재채점 후 감정/주제/키워드를 청크 단위로 갱신하고 sentiment_summary 재구성"""
+    start = time.perf_counter()
+    processed = 0
+    updated = 0
+    aggregator = SentimentAggregator()
+
+    results = rescore_parallel(fetch_reply_history(supabase_client), workers, chunk_size)
+    for batch in iter_chunks(results, chunk_size):
+        processed += len(batch)
+        for row in batch:
+            if row["user_id"]:
+                aggregator.record(
+                    row["user_id"],
+                    {"sentiment": row["sentiment"], "topics": row["topics"], "details": {"issues": row["issues"]}},
+                    at=_parse_timestamp(row["created_at"])
+                )
+        if not dry_run:
+            updated += _apply_rescore_batch(supabase_client, batch)
+
+    summary_rows = 0 if dry_run else _replace_summaries(supabase_client, aggregator)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "processed": processed,
+        "updated": updated,
+        "summary_rows": summary_rows,
+        "rows_per_sec": round(processed / elapsed, 1) if elapsed else 0.0
+    }
+
+
+def _apply_rescore_batch(supabase_client, batch: List[Dict]) -> int:
+    """재채점 결과 한 청크를 RPC 한 번으로 반영 (migration 014), 갱신 건수 반환"""
+    try:
+        result = supabase_client.rpc("apply_reply_history_rescore", {
+            "p_rows": [
+                {
+                    "id": row["id"],
+                    "sentiment": row["sentiment"],
+                    "sentiment_strength": row["sentiment_strength"],
+                    "topics": json.dumps(row["topics"]),
+                    "keywords": json.dumps(row["keywords"])
+                }
+                for row in batch
+            ]
+        }).execute()
+        return result.data or 0
+    except Exception as e:
+        print(f"재채점 저장 실패: {e}")
+        return 0
+
+
+def _replace_summaries(supabase_client, aggregator: SentimentAggregator) -> int:
+    """매장별 sentiment_summary 를 재채점 집계로 교체 (migration 016), 저장한 행 수 반환"""
+    rows_by_user: Dict[str, List[Dict]] = {}
+    for row in aggregator.pending_rows():
+        rows_by_user.setdefault(row["user_id"], []).append(row)
+
+    replaced = 0
+    for user_id, rows in rows_by_user.items():
+        try:
+            result = supabase_client.rpc("replace_sentiment_summary", {
+                "p_user_id": user_id,
+                "p_rows": rows
+            }).execute()
+            replaced += result.data or 0
+        except Exception as e:
+            print(f"감정 집계 재구성 실패 ({user_id}): {e}")
+    return replaced
+
+
+def _default_worker_counts() -> List[int]:
+    """1, 2, 4, ... cpu_count 까지의 워커 수"""
+    cpu_count = os.cpu_count() or 1
+    counts = []
+    workers = 1
+    while workers < cpu_count:
+        counts.append(workers)
+        workers *= 2
+    counts.append(cpu_count)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="reply_history 룰 기반 일괄 재채점 + sentiment_summary 재구성")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    from utils.database import get_supabase_client
+
+    result = rescore_reply_history(
+        get_supabase_client(),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run
+    )
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
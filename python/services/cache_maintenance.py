@@ -0,0 +1,143 @@
+"""
+감정 분석 캐시 수명 관리
+- TTL 만료: 오래 사용되지 않은 캐시 삭제
+- LFU 압축: hit_count 와 최근 사용 시각을 결합한 점수로 목표 크기까지 축소
+- 워밍업: 점수가 높은 캐시를 워커 메모리에 미리 적재
+
+만료/압축은 migration 013 의 RPC 로 DB 안에서 처리한다.
+supabase 클라이언트와 같은 table() / rpc() 인터페이스를 가진
+객체라면 무엇이든 받으므로 로컬 Postgres(PostgREST) 나 대체 객체로도 실행 가능
+
+실행 (주기 작업 / cron): cd python && python -m services.cache_maintenance --max-rows 50000
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from utils.database import execute_async
+
+
+CACHE_TABLE = "sentiment_analysis_cache"
+
+
+class CacheMaintenance:
+    """sentiment_analysis_cache 유지보수 작업"""
+
+    def __init__(
+        self,
+        supabase_client,
+        ttl_days: int = 90,
+        max_rows: int = 50000,
+        half_life_days: float = 14.0
+    ):
+        self.supabase = supabase_client
+        self.ttl_days = ttl_days
+        self.max_rows = max_rows
+        self.half_life_days = half_life_days
+
+    def lfu_score(self, row: Dict, now: Optional[datetime] = None) -> float:
+        """LFU 점수: (hit_count + 1) 을 마지막 사용 이후 경과 시간으로 반감"""
+        now = now or datetime.now(timezone.utc)
+        last_used = _parse_timestamp(row.get("last_used_at")) or _parse_timestamp(row.get("created_at"))
+        age_days = (now - last_used).total_seconds() / 86400 if last_used else self.ttl_days
+        decay = 0.5 ** (max(age_days, 0.0) / self.half_life_days)
+        return ((row.get("hit_count") or 0) + 1) * decay
+
+    async def expire(self) -> int:
+        """TTL 이 지난 캐시 삭제, 삭제 건수 반환 (expire_sentiment_cache RPC)"""
+        try:
+            result = await execute_async(self.supabase.rpc("expire_sentiment_cache", {"p_ttl_days": self.ttl_days}))
+            return result.data or 0
+        except Exception as e:
+            print(f"캐시 만료 처리 실패: {e}")
+            return 0
+
+    async def compact(self) -> int:
+        """
+        LFU 점수가 낮은 캐시부터 삭제하여 max_rows 이하로 유지, 삭제 건수 반환
+
+        점수 계산과 삭제는 compact_sentiment_cache RPC 가 DB 안에서
+        ORDER BY score LIMIT overflow 로 처리한다 (lfu_score 와 같은 식).
+        """
+        try:
+            result = await execute_async(self.supabase.rpc("compact_sentiment_cache", {
+                "p_max_rows": self.max_rows,
+                "p_half_life_days": self.half_life_days
+            }))
+            return result.data or 0
+        except Exception as e:
+            print(f"캐시 압축 실패: {e}")
+            return 0
+
+    async def run(self) -> Dict:
+        """만료 → 압축 순서로 전체 유지보수 실행"""
+        expired = await self.expire()
+        compacted = await self.compact()
+        return {
+            "expired": expired,
+            "compacted": compacted
+        }
+
+    async def load_hot_entries(self, limit: int, now: Optional[datetime] = None) -> List[Dict]:
+        """LFU 점수 상위 limit 개 캐시 행 조회 (워커 워밍업용)"""
+        if limit <= 0:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+
+        # hit_count 상위 후보를 넉넉히 가져온 뒤 최근성까지 반영해 재정렬
+        try:
+            result = await execute_async(
+                self.supabase.table(CACHE_TABLE)\
+                    .select("*")\
+                    .order("hit_count", desc=True)\
+                    .limit(limit * 3)
+            )
+        except Exception as e:
+            print(f"캐시 워밍업 조회 실패: {e}")
+            return []
+
+        rows = result.data or []
+        rows.sort(key=lambda row: self.lfu_score(row, now), reverse=True)
+        return rows[:limit]
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Postgres timestamptz 문자열 → aware datetime"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="감정 분석 캐시 만료 + LFU 압축")
+    parser.add_argument("--ttl-days", type=int, default=90)
+    parser.add_argument("--max-rows", type=int, default=50000)
+    parser.add_argument("--half-life-days", type=float, default=14.0)
+    args = parser.parse_args()
+
+    from utils.database import get_supabase_client
+
+    maintenance = CacheMaintenance(
+        get_supabase_client(),
+        ttl_days=args.ttl_days,
+        max_rows=args.max_rows,
+        half_life_days=args.half_life_days
+    )
+    print(json.dumps(asyncio.run(maintenance.run())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+헤지 요청 유틸리티
+느린 요청이 지연 백분위를 넘으면 같은 요청을 한 번 더 보내고 먼저 성공한 결과를 사용한다.
+전체 지연 예산을 넘기면 진행 중인 요청을 넘긴 채 DeadlineExceeded 를 발생시킨다.
+"""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Set, Tuple
+
+
+class DeadlineExceeded(Exception):
+    """지연 예산 초과 (pending: 아직 진행 중인 요청 태스크, hedged: 헤지 발사 여부)"""
+
+    def __init__(self, pending: Set[asyncio.Future], hedged: bool = False):
+        super().__init__("latency budget exceeded")
+        self.pending = pending
+        self.hedged = hedged
+
+
+class LatencyTracker:
+    """최근 요청 지연 시간 (ms) 슬라이딩 윈도우"""
+
+    def __init__(self, window: int = 200, default_ms: float = 800.0, min_samples: int = 20):
+        self.samples: deque = deque(maxlen=window)
+        self.default_ms = default_ms
+        self.min_samples = min_samples
+
+    def record(self, latency_ms: float):
+        self.samples.append(latency_ms)
+
+    def percentile(self, p: float) -> float:
+        """p 백분위 지연 (샘플이 부족하면 기본값)"""
+        if len(self.samples) < self.min_samples:
+            return self.default_ms
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def first_valid(tasks: Set[asyncio.Future], timeout: float):
+    """
+    가장 먼저 성공한 태스크 결과 반환 (나머지는 취소)
+
+    Returns:
+        (성공한 태스크, 결과)
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    pending = set(tasks)
+    last_error = None
+
+    while pending:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise DeadlineExceeded(pending)
+
+        done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded(pending)
+
+        for task in done:
+            if task.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return task, task.result()
+            last_error = task.exception()
+
+    raise last_error
+
+
+async def hedged_call(
+    factory: Callable[[], Awaitable],
+    hedge_delay: float,
+    timeout: float
+) -> Tuple[object, bool, bool]:
+    """
+    헤지 요청 실행
+
+    Args:
+        factory: 요청 코루틴을 새로 만드는 함수
+        hedge_delay: 첫 요청이 이 시간(초) 안에 끝나지 않으면 중복 요청 발사
+        timeout: 전체 지연 예산(초)
+
+    Returns:
+        (결과, 헤지 발사 여부, 헤지 요청이 이겼는지 여부)
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    primary = asyncio.ensure_future(factory())
+    done, _ = await asyncio.wait({primary}, timeout=min(hedge_delay, timeout))
+
+    if done and primary.exception() is None:
+        return primary.result(), False, False
+
+    # 첫 요청이 느리거나 실패하면 남은 예산 안에서 중복 요청
+    tasks = set() if done else {primary}
+    if deadline - loop.time() <= 0:
+        raise DeadlineExceeded(tasks)
+
+    hedge = asyncio.ensure_future(factory())
+    tasks.add(hedge)
+
+    try:
+        winner, result = await first_valid(tasks, deadline - loop.time())
+    except DeadlineExceeded as e:
+        raise DeadlineExceeded(e.pending, hedged=True)
+    return result, True, winner is hedge
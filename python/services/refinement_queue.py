@@ -0,0 +1,391 @@
+"""
+AI 정밀 분석 백그라운드 보완 큐
+룰 기반 결과를 먼저 응답한 리뷰를 유휴 시간에 AI 로 재분석하여
+sentiment_analysis_cache 행을 제자리에서 갱신한다.
+
+백엔드:
+- SQLiteRefinementQueue: 로컬 파일 (단일 호스트, 테스트용)
+- SupabaseRefinementQueue: refinement_queue 테이블 (여러 워커 공유)
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+# 우선순위 (작을수록 먼저 처리)
+PRIORITY_DEEP = 0    # 정밀 분석이 필요했지만 룰 기반으로 먼저 응답한 리뷰
+PRIORITY_QUICK = 1   # 룰 기반으로 충분했던 리뷰 (가장 낮은 우선순위)
+
+
+class SQLiteRefinementQueue:
+    """SQLite 파일 기반 보완 큐"""
+
+    def __init__(
+        self,
+        path: str = "refinement_queue.db",
+        max_size: int = 10000,
+        max_attempts: int = 3,
+        visibility_timeout: int = 300,
+        failed_retention_days: int = 7
+    ):
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.failed_retention_days = failed_retention_days
+        self.visibility_timeout = visibility_timeout
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS refinement_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content_hash TEXT UNIQUE NOT NULL,
+                content TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                meta TEXT,
+                last_error TEXT,
+                available_at REAL NOT NULL,
+                claimed_at REAL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_refinement_jobs_claim ON refinement_jobs(status, priority, available_at)"
+        )
+
+    def size(self) -> int:
+        """대기 + 처리 중 작업 수"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM refinement_jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()
+        return row[0]
+
+    def put(self, content: str, priority: int = PRIORITY_QUICK, meta: Optional[Dict] = None) -> bool:
+        """작업 추가 (이미 대기/처리 중이면 우선순위만 올림), 큐가 가득 차면 False"""
+        now = time.time()
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._conn.execute(
+                    "SELECT status FROM refinement_jobs WHERE content_hash = ?",
+                    (content_hash,)
+                ).fetchone()
+                if existing and existing[0] in ("pending", "running"):
+                    self._conn.execute(
+                        "UPDATE refinement_jobs SET priority = MIN(priority, ?) WHERE content_hash = ?",
+                        (priority, content_hash)
+                    )
+                    self._conn.execute("COMMIT")
+                    return True
+
+                count = self._conn.execute(
+                    "SELECT COUNT(*) FROM refinement_jobs WHERE status IN ('pending', 'running')"
+                ).fetchone()[0]
+                if count >= self.max_size:
+                    self._conn.execute("ROLLBACK")
+                    return False
+
+                # 최종 실패로 남아 있던 같은 리뷰는 다시 대기열로
+                self._conn.execute(
+                    """
+                    INSERT INTO refinement_jobs (content_hash, content, priority, meta, available_at, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(content_hash) DO UPDATE SET
+                        priority = excluded.priority,
+                        status = 'pending',
+                        attempts = 0,
+                        meta = COALESCE(excluded.meta, meta),
+                        last_error = NULL,
+                        available_at = excluded.available_at
+                    WHERE status = 'failed'
+                    """,
+                    (content_hash, content, priority, json.dumps(meta) if meta else None, now, now)
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def claim(self, limit: int = 1) -> List[Dict]:
+        """
+        처리할 작업 가져오기 (visibility_timeout 이 지난 running 작업도 재할당)
+
+        재할당 대상 중 이미 max_attempts 번 시도한 작업은 최종 실패 처리한다
+        (처리 중 프로세스가 죽는 작업이 무한히 재시도되지 않도록).
+        """
+        now = time.time()
+        stale_before = now - self.visibility_timeout
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    """
+                    UPDATE refinement_jobs SET status = 'failed', available_at = ?, last_error = ?
+                    WHERE status = 'running' AND claimed_at <= ? AND attempts >= ?
+                    """,
+                    (now, "visibility timeout", stale_before, self.max_attempts)
+                )
+                rows = self._conn.execute(
+                    """
+                    SELECT id, content_hash, content, priority, attempts, meta FROM refinement_jobs
+                    WHERE (status = 'pending' AND available_at <= ?)
+                       OR (status = 'running' AND claimed_at <= ?)
+                    ORDER BY priority, available_at
+                    LIMIT ?
+                    """,
+                    (now, stale_before, limit)
+                ).fetchall()
+
+                for row in rows:
+                    self._conn.execute(
+                        "UPDATE refinement_jobs SET status = 'running', claimed_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        (now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return [
+            {
+                "id": row[0],
+                "content_hash": row[1],
+                "content": row[2],
+                "priority": row[3],
+                "attempts": row[4] + 1,
+                "meta": json.loads(row[5]) if row[5] else None
+            }
+            for row in rows
+        ]
+
+    def complete(self, job: Dict):
+        """완료된 작업 삭제 (결과는 캐시 행에 반영되었으므로 리뷰 원문을 남기지 않음)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM refinement_jobs WHERE id = ?", (job["id"],))
+
+    def fail(self, job: Dict, error: str):
+        """실패 처리 (max_attempts 이내면 지수 백오프 후 재시도)"""
+        if job["attempts"] >= self.max_attempts:
+            status, available_at = "failed", time.time()
+        else:
+            status, available_at = "pending", time.time() + 2 ** job["attempts"] * 10
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE refinement_jobs SET status = ?, available_at = ?, last_error = ? WHERE id = ?",
+                (status, available_at, error[:500], job["id"])
+            )
+
+    def purge(self) -> int:
+        """보관 기간이 지난 최종 실패 작업 삭제, 삭제 건수 반환"""
+        cutoff = time.time() - self.failed_retention_days * 86400
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM refinement_jobs WHERE status = 'failed' AND available_at < ?",
+                (cutoff,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        self._conn.close()
+
+
+class SupabaseRefinementQueue:
+    """refinement_queue 테이블 기반 보완 큐 (migration 012)"""
+
+    def __init__(
+        self,
+        supabase_client,
+        max_size: int = 10000,
+        max_attempts: int = 3,
+        failed_retention_days: int = 7
+    ):
+        self.supabase = supabase_client
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.failed_retention_days = failed_retention_days
+
+    def size(self) -> int:
+        result = self.supabase.table("refinement_queue")\
+            .select("id", count="exact")\
+            .in_("status", ["pending", "running"])\
+            .limit(1)\
+            .execute()
+        return result.count or 0
+
+    def put(self, content: str, priority: int = PRIORITY_QUICK, meta: Optional[Dict] = None) -> bool:
+        """작업 추가 (이미 대기/처리 중이면 우선순위만 올림), 큐가 가득 차면 False"""
+        result = self.supabase.rpc("enqueue_refinement_job", {
+            "p_content_hash": hashlib.sha256(content.encode()).hexdigest(),
+            "p_content": content,
+            "p_priority": priority,
+            "p_meta": meta,
+            "p_max_size": self.max_size
+        }).execute()
+        return bool(result.data)
+
+    def claim(self, limit: int = 1) -> List[Dict]:
+        result = self.supabase.rpc("claim_refinement_jobs", {
+            "p_limit": limit,
+            "p_max_attempts": self.max_attempts
+        }).execute()
+        return result.data or []
+
+    def complete(self, job: Dict):
+        """완료된 작업 삭제"""
+        self.supabase.table("refinement_queue")\
+            .delete()\
+            .eq("id", job["id"])\
+            .execute()
+
+    def fail(self, job: Dict, error: str):
+        """실패 처리 (max_attempts 이내면 지수 백오프 후 재시도)"""
+        retry = job["attempts"] < self.max_attempts
+        self.supabase.rpc("fail_refinement_job", {
+            "p_id": job["id"],
+            "p_error": error[:500],
+            "p_retry_after_seconds": 2 ** job["attempts"] * 10 if retry else None
+        }).execute()
+
+    def purge(self) -> int:
+        """보관 기간이 지난 최종 실패 작업 삭제, 삭제 건수 반환"""
+        result = self.supabase.rpc("purge_refinement_jobs", {
+            "p_retention_days": self.failed_retention_days
+        }).execute()
+        return result.data or 0
+
+    def close(self):
+        pass
+
+
+class RefinementWorker:
+    """
+    유휴 용량에서 보완 작업 처리
+
+    처리량 제어:
+    - concurrency: 동시 AI 호출 수
+    - rate_per_minute: 분당 최대 AI 호출 수
+    - idle_threshold: 처리 중인 사용자 요청이 이 값을 넘으면 대기
+    - max_idle_wait: 요청이 끊이지 않아도 이 시간(초)마다 최소 1건은 처리 (큐가 계속 쌓이지 않도록)
+
+    purge_interval 마다 보관 기간이 지난 최종 실패 작업을 정리한다.
+    """
+
+    def __init__(
+        self,
+        analyzer,
+        queue,
+        concurrency: int = 2,
+        rate_per_minute: int = 60,
+        idle_threshold: int = 2,
+        max_idle_wait: float = 30.0,
+        poll_interval: float = 1.0,
+        purge_interval: float = 3600.0,
+        on_refined: Optional[Callable[[Dict, Dict], Awaitable]] = None
+    ):
+        self.analyzer = analyzer
+        self.queue = queue
+        self.concurrency = concurrency
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self.idle_threshold = idle_threshold
+        self.max_idle_wait = max_idle_wait
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+        self.on_refined = on_refined
+
+        self.stats = {"refined": 0, "failed": 0}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._next_start = 0.0
+        self._next_purge = 0.0
+        self._running: set = set()
+        self._stopping = False
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """이벤트 루프에서 백그라운드 실행"""
+        self._stopping = False
+        self._loop_task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """새 작업 가져오기 중단 후 진행 중인 작업 완료 대기"""
+        self._stopping = True
+        if self._loop_task:
+            await self._loop_task
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def run_once(self, limit: Optional[int] = None) -> int:
+        """유휴 여부와 관계없이 대기 작업을 한 번 처리 (배치/테스트용), 처리 건수 반환"""
+        jobs = await asyncio.to_thread(self.queue.claim, limit or self.concurrency)
+        await asyncio.gather(*(self._process(job) for job in jobs))
+        return len(jobs)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_start = loop.time()
+
+        while not self._stopping:
+            if loop.time() >= self._next_purge:
+                self._next_purge = loop.time() + self.purge_interval
+                try:
+                    await asyncio.to_thread(self.queue.purge)
+                except Exception as e:
+                    print(f"보완 큐 정리 실패: {e}")
+
+            # 사용자 요청 처리 중이거나 동시 처리 한도에 도달하면 대기 (max_idle_wait 이 지나면 바빠도 1건 처리)
+            busy = self.analyzer.active_requests > self.idle_threshold
+            if len(self._running) >= self.concurrency or (busy and loop.time() - last_start < self.max_idle_wait):
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            # 분당 호출 수 제한
+            wait = self._next_start - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            try:
+                jobs = await asyncio.to_thread(self.queue.claim, 1)
+            except Exception as e:
+                print(f"보완 큐 조회 실패: {e}")
+                jobs = []
+
+            if not jobs:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            last_start = loop.time()
+            self._next_start = last_start + self.min_interval
+            task = asyncio.ensure_future(self._process(jobs[0]))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _process(self, job: Dict):
+        """작업 1건: AI 정밀 분석 → 캐시 행 갱신 → (선택) 호출자 알림"""
+        async with self._semaphore:
+            try:
+                analysis = await self.analyzer.refine(job["content"], job.get("meta"))
+                await asyncio.to_thread(self.queue.complete, job)
+                self.stats["refined"] += 1
+            except Exception as e:
+                print(f"AI 분석 보완 실패: {e}")
+                await asyncio.to_thread(self.queue.fail, job, str(e))
+                self.stats["failed"] += 1
+                return
+
+        if self.on_refined:
+            try:
+                await self.on_refined(job, analysis)
+            except Exception as e:
+                print(f"보완 결과 알림 실패: {e}")
@@ -0,0 +1,184 @@
+"""
+매장별 감정 증분 집계
+분석이 끝날 때마다 사용자(매장)·일자별 감정/주제/이슈 키워드 건수를 메모리에 누적하고
+배치로 sentiment_summary 테이블에 반영하여 대시보드가 reply_history 를 스캔하지 않게 한다.
+"""
+
+import json
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from utils.database import execute_async
+
+
+SUMMARY_TABLE = "sentiment_summary"
+
+DIMENSIONS = ("sentiment", "topic", "issue")
+
+# sentiment_summary.key VARCHAR(100)
+MAX_KEY_LENGTH = 100
+
+# 같은 매장 증분이 연속으로 이만큼 반영 실패하면 폐기 (FK 위반 등으로 다른 매장 증분까지 막지 않도록)
+MAX_FLUSH_ATTEMPTS = 5
+
+# (user_id, bucket_date, dimension, key)
+AggregateKey = Tuple[str, str, str, str]
+
+
+class SentimentAggregator:
+    """감정 증분 집계기"""
+
+    def __init__(self, supabase_client=None, flush_threshold: int = 200):
+        self.supabase = supabase_client
+        self.flush_threshold = flush_threshold
+        self.pending: Counter = Counter()
+        self.flush_failures: Counter = Counter()
+        self.dropped = 0
+
+    def record(self, user_id: str, analysis: Dict, at: Optional[datetime] = None):
+        """분석 결과 1건을 집계에 반영"""
+        bucket = (at or datetime.now(timezone.utc)).date().isoformat()
+
+        self._add(user_id, bucket, "sentiment", analysis.get("sentiment", "neutral"))
+
+        topics = analysis.get("topics") or []
+        if isinstance(topics, str):
+            # 캐시/이력 행의 JSONB 문자열 (json.dumps 로 저장된 목록)
+            try:
+                topics = json.loads(topics)
+            except ValueError:
+                topics = [topics]
+
+        for topic in topics:
+            if topic:
+                self._add(user_id, bucket, "topic", topic)
+
+        issues = (analysis.get("details") or {}).get("issues") or []
+        for keyword in dict.fromkeys(issue["keyword"] for issue in issues):
+            self._add(user_id, bucket, "issue", keyword)
+
+    def _add(self, user_id: str, bucket: str, dimension: str, key: str):
+        """키는 컬럼 길이에 맞게 잘라서 누적 (긴 키 하나가 배치 전체를 실패시키지 않도록)"""
+        self.pending[(user_id, bucket, dimension, str(key)[:MAX_KEY_LENGTH])] += 1
+
+    def pending_rows(self) -> List[Dict]:
+        """누적된 증분 → sentiment_summary 행 형태"""
+        return _summary_rows(self.pending)
+
+    def should_flush(self) -> bool:
+        """배치 반영 필요 여부"""
+        return len(self.pending) >= self.flush_threshold
+
+    async def flush(self) -> int:
+        """
+        누적된 증분을 summary 테이블에 반영, 반영한 행 수 반환
+
+        배치 전체가 실패하면 매장별로 나눠 다시 보내고, 실패한 매장 증분만 다음 flush 로 넘긴다.
+        같은 매장이 MAX_FLUSH_ATTEMPTS 번 연속 실패하면 그 증분은 폐기한다.
+        """
+        if not self.supabase or not self.pending:
+            return 0
+
+        batch = self.pending
+        self.pending = Counter()
+
+        if await self._send(batch):
+            self.flush_failures.clear()
+            return len(batch)
+
+        by_user: Dict[str, Counter] = {}
+        for key, count in batch.items():
+            by_user.setdefault(key[0], Counter())[key] = count
+
+        flushed = 0
+        for user_id, user_batch in by_user.items():
+            if await self._send(user_batch):
+                self.flush_failures.pop(user_id, None)
+                flushed += len(user_batch)
+                continue
+
+            self.flush_failures[user_id] += 1
+            if self.flush_failures[user_id] >= MAX_FLUSH_ATTEMPTS:
+                print(f"감정 집계 폐기: {user_id} ({len(user_batch)}행, {MAX_FLUSH_ATTEMPTS}회 연속 실패)")
+                self.flush_failures.pop(user_id)
+                self.dropped += len(user_batch)
+            else:
+                self.pending.update(user_batch)
+        return flushed
+
+    async def _send(self, batch: Counter) -> bool:
+        """증분 배치를 RPC 한 번으로 반영"""
+        try:
+            await execute_async(self.supabase.rpc("increment_sentiment_summary", {"p_rows": _summary_rows(batch)}))
+            return True
+        except Exception as e:
+            print(f"감정 집계 저장 실패: {e}")
+            return False
+
+    async def get_summary(
+        self,
+        user_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict:
+        """
+        기간별 집계 조회 (저장된 집계 + 아직 반영되지 않은 증분)
+
+        summary 테이블 조회가 실패하면 예외를 그대로 올린다 (빈 집계와 구분되도록).
+
+        Returns:
+            {
+                "sentiment": {"positive": 120, "negative": 14, "neutral": 30},
+                "topic": {"맛/품질": 80, "서비스": 41},
+                "issue": {"불친절": 6, "느린": 3},
+                "daily": {"2024-05-01": {"positive": 4, "negative": 1}}
+            }
+        """
+        end = end or datetime.now(timezone.utc).date()
+        start = start or end - timedelta(days=30)
+        start_key, end_key = start.isoformat(), end.isoformat()
+
+        summary: Dict = {dimension: Counter() for dimension in DIMENSIONS}
+        daily: Dict[str, Counter] = {}
+
+        def add(bucket: str, dimension: str, key: str, count: int):
+            if dimension not in summary:
+                return
+            summary[dimension][key] += count
+            if dimension == "sentiment":
+                daily.setdefault(bucket, Counter())[key] += count
+
+        if self.supabase:
+            result = await execute_async(
+                self.supabase.table(SUMMARY_TABLE)\
+                    .select("bucket_date, dimension, key, count")\
+                    .eq("user_id", user_id)\
+                    .gte("bucket_date", start_key)\
+                    .lte("bucket_date", end_key)
+            )
+            for row in result.data or []:
+                add(row["bucket_date"], row["dimension"], row["key"], row["count"])
+
+        for (pending_user, bucket, dimension, key), count in self.pending.items():
+            if pending_user == user_id and start_key <= bucket <= end_key:
+                add(bucket, dimension, key, count)
+
+        return {
+            **{dimension: dict(counter.most_common()) for dimension, counter in summary.items()},
+            "daily": {bucket: dict(counter) for bucket, counter in sorted(daily.items())}
+        }
+
+
+def _summary_rows(batch: Counter) -> List[Dict]:
+    """(user_id, bucket_date, dimension, key) → count 를 sentiment_summary 행 형태로"""
+    return [
+        {
+            "user_id": user_id,
+            "bucket_date": bucket,
+            "dimension": dimension,
+            "key": key,
+            "count": count
+        }
+        for (user_id, bucket, dimension, key), count in batch.items()
+    ]
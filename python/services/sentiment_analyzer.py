@@ -5,19 +5,90 @@
 3단계: AI 정밀 분석 (조건부 - 부정리뷰/복잡한리뷰)
 """
 
+import asyncio
 import hashlib
 import json
-from typing import Dict, List, Optional
-from openai import OpenAI
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from openai import AsyncOpenAI
 import time
 
+from utils.database import execute_async
+from utils.token_budget import TokenEstimator, estimate_cost, truncate_to_budget
+from .cache_maintenance import CacheMaintenance
+from .hedging import DeadlineExceeded, LatencyTracker, first_valid, hedged_call
+from .refinement_queue import PRIORITY_DEEP, PRIORITY_QUICK
+
+
+# AI 정밀 분석 입력 리뷰 최대 토큰 (초과 시 앞뒤 문장만 남기고 축약)
+MAX_REVIEW_TOKENS = 400
+
+# AI 정밀 분석 max_tokens (8개 필드 JSON 이 잘리지 않는 고정값, 잘리면 재요청 한도로 한 번 더)
+DEEP_MAX_TOKENS = 500
+DEEP_RETRY_MAX_TOKENS = 1000
+
+# 지연 샘플이 부족할 때 헤지 지연 (지연 예산 대비 비율)
+DEFAULT_HEDGE_FRACTION = 0.5
+
+# 지연 예산 초과 후 백그라운드에서 마저 기다리는 보완 작업 최대 개수 (넘으면 보완 생략)
+MAX_BACKGROUND_REFINEMENTS = 100
+
+# 기다리지 않고 실행 중인 보완 큐 추가 최대 개수 (DB 가 느릴 때 태스크가 쌓이지 않도록)
+MAX_BACKGROUND_ENQUEUES = 1000
+
+# 워커 메모리에 유지하는 캐시 최대 개수 (넘으면 가장 오래 안 쓴 항목부터 제거)
+MEMORY_CACHE_SIZE = 2000
+
+# 워커 메모리 캐시 유효 시간 (다른 워커의 삭제/보완 갱신이 이 시간 안에 반영됨)
+MEMORY_CACHE_TTL_SECONDS = 300
+
 
 class SentimentAnalyzer:
     """감정 분석 엔진"""
 
-    def __init__(self, openai_api_key: str, supabase_client=None):
-        self.client = OpenAI(api_key=openai_api_key)
+    def __init__(
+        self,
+        openai_api_key: Optional[str],
+        supabase_client=None,
+        openai_client: Optional[AsyncOpenAI] = None,
+        latency_budget_ms: Optional[int] = None,
+        hedge_percentile: float = 0.9,
+        refinement_queue=None,
+        defer_deep_analysis: bool = False,
+        on_background_usage: Optional[Callable[[Optional[Dict], Dict], Awaitable]] = None
+    ):
+        # API 키 없이 생성하면 룰 기반 단계만 사용 (오프라인 일괄 재채점용)
+        if openai_client is None and openai_api_key:
+            openai_client = AsyncOpenAI(api_key=openai_api_key)
+        self.client = openai_client
         self.supabase = supabase_client
+        self.token_estimator = TokenEstimator("gpt-4o-mini")
+
+        # 지연 SLO 모드 (latency_budget_ms 설정 시 활성화)
+        # hedge_percentile 지연을 넘으면 중복 요청, 예산 초과 시 룰 기반 결과 반환 후 백그라운드 보완
+        self.latency_budget_ms = latency_budget_ms
+        self.hedge_percentile = hedge_percentile
+        # 샘플이 모이기 전에는 예산의 DEFAULT_HEDGE_FRACTION 지점에서 헤지 (예산이 짧아도 헤지 가능)
+        self.latency_tracker = LatencyTracker(
+            default_ms=latency_budget_ms * DEFAULT_HEDGE_FRACTION if latency_budget_ms else 800.0
+        )
+        self.slo_metrics: Counter = Counter()
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._enqueue_tasks: Set[asyncio.Task] = set()
+
+        # 사용자 요청 응답에 포함되지 않는 AI 호출 사용량 (백그라운드 보완, 예산 초과로 취소된 요청)
+        # on_background_usage(refinement_meta, usage) 로 호출자에게도 알림 (api_usage_logs 기록용)
+        self.background_usage: Counter = Counter()
+        self.on_background_usage = on_background_usage
+
+        # 백그라운드 보완 큐 (설정 시 룰 기반 결과를 유휴 시간에 AI 결과로 갱신)
+        # defer_deep_analysis=True 이면 정밀 분석이 필요한 리뷰도 룰 기반으로 먼저 응답
+        self.refinement_queue = refinement_queue
+        self.defer_deep_analysis = defer_deep_analysis
+        self.active_requests = 0
+
+        # 워커 메모리 캐시 (content_hash → (캐시 행, 적재 시각))
+        self.memory_cache: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
 
         # 감정 키워드 사전 (문서 로직 그대로)
         self.sentiment_keywords = {
@@ -70,8 +141,21 @@ class SentimentAnalyzer:
         # 증폭 표현
         self.amplifiers = ["너무", "정말", "진짜", "완전", "엄청", "매우", "아주"]
 
-    async def analyze(self, content: str) -> Dict:
-        """통합 감정 분석"""
+    async def analyze(self, content: str, refinement_meta: Optional[Dict] = None) -> Dict:
+        """
+        통합 감정 분석
+
+        Args:
+            content: 리뷰 내용
+            refinement_meta: 보완 큐에 함께 저장할 호출자 정보 (완료 알림용)
+        """
+        self.active_requests += 1
+        try:
+            return await self._analyze(content, refinement_meta)
+        finally:
+            self.active_requests -= 1
+
+    async def _analyze(self, content: str, refinement_meta: Optional[Dict]) -> Dict:
         start_time = time.time()
 
         # 캐시 확인 (SHA-256 해시)
@@ -94,8 +178,20 @@ class SentimentAnalyzer:
             quick_result["confidence"] < 0.7             # 낮은 신뢰도
         )
 
-        if needs_deep_analysis:
-            analysis = await self._deep_analysis_with_ai(content, quick_result, topic_result)
+        # 보완 큐 사용 시 룰 기반 결과로 먼저 응답 (큐가 가득 차면 기존대로 즉시 AI 분석)
+        if needs_deep_analysis and self.defer_deep_analysis and self._can_refine():
+            analysis = self._build_fallback_analysis(content, quick_result, topic_result)
+            analysis["analysis_time_ms"] = int((time.time() - start_time) * 1000)
+
+            # 캐시 저장 후 큐에 넣어야 워커의 갱신 결과가 덮어써지지 않음
+            await self._save_to_cache(content, analysis)
+            if await self._enqueue_refinement(content, PRIORITY_DEEP, refinement_meta):
+                analysis["refinement_queued"] = True
+                return analysis
+
+        refinement = None
+        if needs_deep_analysis and self.client:
+            analysis, refinement = await self._deep_analysis_with_ai(content, quick_result, topic_result)
         else:
             analysis = self._build_fallback_analysis(content, quick_result, topic_result)
 
@@ -105,6 +201,50 @@ class SentimentAnalyzer:
         # 캐시 저장
         await self._save_to_cache(content, analysis)
 
+        # 지연 예산 초과로 룰 기반 결과를 반환한 경우 AI 결과로 캐시 보완
+        if refinement:
+            analysis["refinement_queued"] = await self._schedule_refinement(
+                content, quick_result, topic_result, refinement_meta, *refinement
+            )
+        elif analysis["analysis_source"] == "rule-based" and self._can_refine():
+            # 응답은 큐 추가 결과와 무관하므로 기다리지 않음 (룰 기반 응답에 DB 왕복을 더하지 않도록)
+            priority = PRIORITY_DEEP if needs_deep_analysis else PRIORITY_QUICK
+            self._enqueue_in_background(content, priority, refinement_meta)
+
+        return analysis
+
+    def _can_refine(self) -> bool:
+        return bool(self.client and self.refinement_queue and self.supabase)
+
+    def _enqueue_in_background(self, content: str, priority: int, meta: Optional[Dict]):
+        """보완 큐 추가를 기다리지 않고 실행 (MAX_BACKGROUND_ENQUEUES 개를 넘으면 생략)"""
+        if len(self._enqueue_tasks) >= MAX_BACKGROUND_ENQUEUES:
+            return
+
+        task = asyncio.ensure_future(self._enqueue_refinement(content, priority, meta))
+        self._enqueue_tasks.add(task)
+        task.add_done_callback(self._enqueue_tasks.discard)
+
+    async def _enqueue_refinement(self, content: str, priority: int, meta: Optional[Dict]) -> bool:
+        """보완 큐에 추가 (캐시 저장 후 호출해야 갱신 결과가 덮어써지지 않음), 큐가 가득 차면 False"""
+        try:
+            return await asyncio.to_thread(self.refinement_queue.put, content, priority, meta)
+        except Exception as e:
+            print(f"보완 큐 추가 실패: {e}")
+            return False
+
+    async def refine(self, content: str, meta: Optional[Dict] = None) -> Dict:
+        """보완 작업: AI 정밀 분석 후 캐시 행을 제자리에서 갱신 (실패 시 예외)"""
+        quick_result = self._quick_sentiment_analysis(content)
+        topic_result = self._extract_topics_and_keywords(content)
+        review_text = truncate_to_budget(content, MAX_REVIEW_TOKENS)
+        messages = self._build_deep_messages(review_text)
+
+        ai_result, usage = await self._request_deep_analysis(messages, DEEP_MAX_TOKENS)
+        await self._record_background_usage(meta, usage)
+        analysis = self._build_deep_analysis(ai_result, usage, quick_result, topic_result)
+
+        await self._upgrade_cache(content, analysis)
         return analysis
 
     def _quick_sentiment_analysis(self, content: str) -> Dict:
@@ -202,11 +342,47 @@ class SentimentAnalyzer:
             "issues": issues
         }
 
-    async def _deep_analysis_with_ai(self, content: str, quick_result: Dict, topic_result: Dict) -> Dict:
-        """3단계: AI 정밀 분석 (문서 프롬프트 그대로)"""
+    async def _deep_analysis_with_ai(
+        self,
+        content: str,
+        quick_result: Dict,
+        topic_result: Dict
+    ) -> Tuple[Dict, Optional[Tuple[Set[asyncio.Future], List[Dict], int]]]:
+        """
+        3단계: AI 정밀 분석 (문서 프롬프트 그대로)
+
+        Returns:
+            (분석 결과, 지연 예산 초과 시 보완에 넘길 (진행 중인 요청, 메시지, max_tokens) 또는 None)
+        """
+        # 긴 리뷰는 토큰 예산에 맞게 축약
+        review_text = truncate_to_budget(content, MAX_REVIEW_TOKENS)
+        messages = self._build_deep_messages(review_text)
+        max_tokens = DEEP_MAX_TOKENS
+
+        try:
+            if self.latency_budget_ms:
+                ai_result, usage = await self._hedged_deep_request(messages, max_tokens)
+            else:
+                ai_result, usage = await self._request_deep_analysis(messages, max_tokens)
+
+            return self._build_deep_analysis(ai_result, usage, quick_result, topic_result), None
+        except DeadlineExceeded as e:
+            if e.hedged:
+                self.slo_metrics["hedges_fired"] += 1
+            self.slo_metrics["deadline_fallbacks"] += 1
+
+            analysis = self._build_fallback_analysis(content, quick_result, topic_result)
+            analysis["needs_refinement"] = True
+            return analysis, (e.pending, messages, max_tokens)
+        except Exception as e:
+            print(f"AI 분석 실패: {e}")
+            return self._build_fallback_analysis(content, quick_result, topic_result), None
+
+    def _build_deep_messages(self, review_text: str) -> List[Dict]:
+        """AI 정밀 분석 프롬프트"""
         prompt = f"""다음 고객 리뷰를 정밀 분석해주세요:
 
-리뷰: "{content}"
+리뷰: "{review_text}"
 
 분석 항목:
 1. 전체 감정 (positive/negative/neutral)
@@ -229,42 +405,235 @@ JSON 형식으로만 응답하세요:
   "summary": "한줄 요약"
 }}"""
 
+        return [
+            {"role": "system", "content": "당신은 고객 리뷰 분석 전문가입니다. JSON 형식으로만 응답하세요."},
+            {"role": "user", "content": prompt}
+        ]
+
+    async def _request_deep_analysis(self, messages: List[Dict], max_tokens: int) -> Tuple[Dict, Dict]:
+        """
+        AI 정밀 분석 요청 (유효한 JSON 이 아니면 예외)
+
+        max_tokens 에 걸려 응답이 잘리면 DEEP_RETRY_MAX_TOKENS 로 한 번 더 요청한다.
+        헤지에 져서 취소된 요청도 취소 시점까지의 지연을 기록한다
+        (느린 요청이 빠지면 지연 분포의 꼬리가 잘려 헤지 지연이 계속 줄어듦).
+
+        Returns:
+            (AI 응답 JSON, 토큰 사용량)
+        """
+        start = time.perf_counter()
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 고객 리뷰 분석 전문가입니다. JSON 형식으로만 응답하세요."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500,
-                response_format={"type": "json_object"}
-            )
+            response = await self._create_deep_completion(messages, max_tokens)
+            usage = self._build_usage(messages, response)
+            if response.choices[0].finish_reason == "length" and max_tokens < DEEP_RETRY_MAX_TOKENS:
+                print(f"AI 분석 응답 잘림 (max_tokens={max_tokens}), 재요청")
+                response = await self._create_deep_completion(messages, DEEP_RETRY_MAX_TOKENS)
+                usage = self._merge_usage(usage, self._build_usage(messages, response))
+        finally:
+            self.latency_tracker.record((time.perf_counter() - start) * 1000)
+
+        ai_result = json.loads(response.choices[0].message.content)
+        if not isinstance(ai_result, dict):
+            raise ValueError("AI 분석 응답이 JSON 객체가 아닙니다.")
+
+        return ai_result, usage
+
+    async def _create_deep_completion(self, messages: List[Dict], max_tokens: int):
+        return await self.client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"}
+        )
 
-            ai_result = json.loads(response.choices[0].message.content)
+    async def _hedged_deep_request(self, messages: List[Dict], max_tokens: int) -> Tuple[Dict, Dict]:
+        """지연 백분위를 넘으면 중복 요청, 예산 초과 시 DeadlineExceeded"""
+        self.slo_metrics["deep_requests"] += 1
 
-            return {
-                "success": True,
-                "sentiment": ai_result.get("sentiment", quick_result["sentiment"]),
-                "sentiment_strength": ai_result.get("sentiment_strength", quick_result["confidence"]),
-                "topics": [t if isinstance(t, str) else t.get("topic", "") for t in ai_result.get("topics", [t["topic"] for t in topic_result["topics"]])],
-                "keywords": ai_result.get("keywords", topic_result["keywords"]),
-                "intent": ai_result.get("intent", "일반"),
-                "reply_focus": ai_result.get("reply_focus", []),
-                "reply_avoid": ai_result.get("reply_avoid", []),
-                "summary": ai_result.get("summary", ""),
-                "analysis_depth": "deep",
-                "analysis_source": "ai",
-                "model_used": "gpt-4o-mini",
-                "details": {
-                    "quick_scores": quick_result["scores"],
-                    "detected_topics": topic_result["topics"],
-                    "issues": topic_result["issues"]
-                }
+        hedge_delay_ms = min(self.latency_tracker.percentile(self.hedge_percentile), self.latency_budget_ms)
+        result, hedged, hedge_won = await hedged_call(
+            lambda: self._request_deep_analysis(messages, max_tokens),
+            hedge_delay=hedge_delay_ms / 1000,
+            timeout=self.latency_budget_ms / 1000
+        )
+
+        if hedged:
+            self.slo_metrics["hedges_fired"] += 1
+            # 진 요청은 usage 없이 취소되므로 전송한 프롬프트 토큰을 추정해 이번 요청 사용량에 포함
+            ai_result, usage = result
+            result = ai_result, self._merge_usage(usage, self._cancelled_usage(messages, 1))
+        if hedge_won:
+            self.slo_metrics["hedge_wins"] += 1
+        return result
+
+    def _build_deep_analysis(self, ai_result: Dict, usage: Dict, quick_result: Dict, topic_result: Dict) -> Dict:
+        """AI 응답 + 룰 기반 결과 조합"""
+        return {
+            "success": True,
+            "sentiment": ai_result.get("sentiment", quick_result["sentiment"]),
+            "sentiment_strength": ai_result.get("sentiment_strength", quick_result["confidence"]),
+            "topics": [t if isinstance(t, str) else t.get("topic", "") for t in ai_result.get("topics", [t["topic"] for t in topic_result["topics"]])],
+            "keywords": ai_result.get("keywords", topic_result["keywords"]),
+            "intent": ai_result.get("intent", "일반"),
+            "reply_focus": ai_result.get("reply_focus", []),
+            "reply_avoid": ai_result.get("reply_avoid", []),
+            "summary": ai_result.get("summary", ""),
+            "analysis_depth": "deep",
+            "analysis_source": "ai",
+            "model_used": "gpt-4o-mini",
+            "usage": usage,
+            "details": {
+                "quick_scores": quick_result["scores"],
+                "detected_topics": topic_result["topics"],
+                "issues": topic_result["issues"]
             }
+        }
+
+    async def _schedule_refinement(
+        self,
+        content: str,
+        quick_result: Dict,
+        topic_result: Dict,
+        meta: Optional[Dict],
+        pending: Set[asyncio.Future],
+        messages: List[Dict],
+        max_tokens: int
+    ) -> bool:
+        """
+        예산 초과로 룰 기반 결과를 반환한 리뷰의 AI 보완 예약, 예약했으면 True
+
+        보완 큐가 있으면 진행 중인 요청을 취소하고 큐에 넘긴다 (재시작에도 유실되지 않음).
+        없으면 진행 중인 요청을 백그라운드 태스크로 마저 기다리되
+        MAX_BACKGROUND_REFINEMENTS 개를 넘으면 보완을 생략한다.
+        """
+        if self._can_refine() and await self._enqueue_refinement(content, PRIORITY_DEEP, meta):
+            await self._cancel_pending(pending, messages, meta)
+            self.slo_metrics["refinements_queued"] += 1
+            return True
+
+        if len(self._background_tasks) >= MAX_BACKGROUND_REFINEMENTS:
+            await self._cancel_pending(pending, messages, meta)
+            self.slo_metrics["refinements_dropped"] += 1
+            return False
+
+        task = asyncio.ensure_future(
+            self._refine(content, quick_result, topic_result, meta, pending, messages, max_tokens)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return True
+
+    async def _refine(
+        self,
+        content: str,
+        quick_result: Dict,
+        topic_result: Dict,
+        meta: Optional[Dict],
+        pending: Set[asyncio.Future],
+        messages: List[Dict],
+        max_tokens: int
+    ):
+        """진행 중이던 요청(없거나 실패하면 새 요청) 결과로 캐시 보완"""
+        try:
+            try:
+                if not pending:
+                    raise ValueError("진행 중인 요청 없음")
+                _, (ai_result, usage) = await first_valid(pending, timeout=60)
+                if len(pending) > 1:
+                    # 헤지 요청 중 진 쪽은 usage 없이 취소됨
+                    usage = self._merge_usage(usage, self._cancelled_usage(messages, len(pending) - 1))
+            except Exception:
+                ai_result, usage = await self._request_deep_analysis(messages, max_tokens)
+
+            await self._record_background_usage(meta, usage)
+            analysis = self._build_deep_analysis(ai_result, usage, quick_result, topic_result)
+            await self._upgrade_cache(content, analysis)
+            self.slo_metrics["refinements_completed"] += 1
         except Exception as e:
-            print(f"AI 분석 실패: {e}")
-            return self._build_fallback_analysis(content, quick_result, topic_result)
+            self.slo_metrics["refinements_failed"] += 1
+            print(f"AI 분석 보완 실패: {e}")
+        finally:
+            # 종료 시 취소되어도 진행 중이던 요청이 남지 않도록
+            for task in pending:
+                task.cancel()
+
+    async def _cancel_pending(self, pending: Set[asyncio.Future], messages: List[Dict], meta: Optional[Dict]):
+        """진행 중인 요청 취소 (이미 전송한 프롬프트 토큰은 백그라운드 사용량으로 기록)"""
+        in_flight = [task for task in pending if not task.done()]
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await self._record_background_usage(meta, self._cancelled_usage(messages, len(in_flight)))
+
+    def _cancelled_usage(self, messages: List[Dict], count: int) -> Dict:
+        """usage 를 받기 전에 취소된 요청 count 개의 추정 사용량 (프롬프트 토큰만)"""
+        usage = self.token_estimator.estimate_usage(messages, "")
+        return {key: value * count for key, value in usage.items()}
+
+    async def _record_background_usage(self, meta: Optional[Dict], usage: Dict):
+        """사용자 응답에 포함되지 않는 AI 호출 사용량 누적 및 호출자 알림"""
+        for key, value in usage.items():
+            self.background_usage[key] += value
+        if self.on_background_usage:
+            try:
+                await self.on_background_usage(meta, usage)
+            except Exception as e:
+                print(f"백그라운드 사용량 기록 실패: {e}")
+
+    async def aclose(self, timeout: float = 5.0):
+        """종료 시 보완 큐 추가 / 백그라운드 보완 작업을 timeout 초까지 기다린 뒤 남은 작업 취소"""
+        tasks = self._enqueue_tasks | self._background_tasks
+        if not tasks:
+            return
+
+        _, unfinished = await asyncio.wait(tasks, timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def get_slo_metrics(self) -> Dict:
+        """헤지/예산 초과 발생 횟수 및 비율"""
+        requests = self.slo_metrics["deep_requests"]
+        return {
+            **{key: self.slo_metrics[key] for key in (
+                "deep_requests", "hedges_fired", "hedge_wins", "deadline_fallbacks",
+                "refinements_completed", "refinements_failed", "refinements_queued", "refinements_dropped"
+            )},
+            "background_tokens": self.background_usage["total_tokens"],
+            "background_cost": round(self.background_usage["estimated_cost"], 6),
+            "hedge_rate": round(self.slo_metrics["hedges_fired"] / requests, 4) if requests else 0.0,
+            "deadline_fallback_rate": round(self.slo_metrics["deadline_fallbacks"] / requests, 4) if requests else 0.0,
+            "hedge_delay_ms": round(self.latency_tracker.percentile(self.hedge_percentile), 1)
+        }
+
+    def _build_usage(self, messages: list, response) -> Dict:
+        """토큰 사용량 및 비용 (실측 usage 없으면 실제 출력 텍스트로 추정)"""
+        completion_text = response.choices[0].message.content or ""
+        response_usage = response.usage
+        self.token_estimator.record_usage(messages, response_usage, completion_text)
+
+        if response_usage:
+            prompt_tokens = response_usage.prompt_tokens
+            completion_tokens = response_usage.completion_tokens
+            return {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "estimated_cost": estimate_cost("gpt-4o-mini", prompt_tokens, completion_tokens)
+            }
+
+        return self.token_estimator.estimate_usage(messages, completion_text)
+
+    def _merge_usage(self, first: Dict, second: Dict) -> Dict:
+        """재요청 시 두 요청 사용량 합산"""
+        return {key: first[key] + second[key] for key in first}
+
+    def estimate_deep_request(self, content: str) -> Dict:
+        """AI 정밀 분석 1회의 사전 비용 계산 (쿼터 확인용 상한값)"""
+        review_text = truncate_to_budget(content, MAX_REVIEW_TOKENS)
+        return self.token_estimator.estimate_request_cost(self._build_deep_messages(review_text), DEEP_MAX_TOKENS)
 
     def _build_fallback_analysis(self, content: str, quick_result: Dict, topic_result: Dict) -> Dict:
         """AI 호출 없이 룰 기반 결과 조합"""
@@ -303,49 +672,95 @@ JSON 형식으로만 응답하세요:
             }
         }
 
+    def _content_hash(self, content: str) -> str:
+        """캐시 키 (SHA-256)"""
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    async def warm_start(self, limit: int = MEMORY_CACHE_SIZE) -> int:
+        """부팅 시 LFU 점수 상위 캐시를 메모리에 적재, 적재 건수 반환"""
+        if not self.supabase:
+            return 0
+
+        maintenance = CacheMaintenance(self.supabase)
+        rows = await maintenance.load_hot_entries(min(limit, MEMORY_CACHE_SIZE))
+        # 점수 낮은 항목이 먼저 밀려나도록 역순 적재
+        for row in reversed(rows):
+            self._memory_cache_put(row["content_hash"], row)
+        return len(rows)
+
     async def _check_cache(self, content: str) -> Optional[Dict]:
-        """캐시 확인"""
+        """캐시 확인 (메모리 → DB 순)"""
         if not self.supabase:
             return None
 
-        try:
-            content_hash = hashlib.sha256(content.encode()).hexdigest()
+        content_hash = self._content_hash(content)
+        cache_data = self._memory_cache_get(content_hash)
+        if cache_data is None:
+            try:
+                result = await execute_async(
+                    self.supabase.table("sentiment_analysis_cache")\
+                        .select("*")\
+                        .eq("content_hash", content_hash)
+                )
+            except Exception as e:
+                print(f"캐시 조회 실패: {e}")
+                return None
 
-            result = self.supabase.table("sentiment_analysis_cache")\
-                .select("*")\
-                .eq("content_hash", content_hash)\
-                .execute()
+            if not result.data:
+                return None
 
-            if result.data and len(result.data) > 0:
-                cache_data = result.data[0]
+            cache_data = result.data[0]
+            self._memory_cache_put(content_hash, cache_data)
 
-                # 히트 카운트 증가
-                self.supabase.table("sentiment_analysis_cache")\
-                    .update({
-                        "hit_count": cache_data["hit_count"] + 1,
-                        "last_used_at": "NOW()"
-                    })\
-                    .eq("content_hash", content_hash)\
-                    .execute()
-
-                return {
-                    "success": True,
-                    "sentiment": cache_data["sentiment"],
-                    "sentiment_strength": float(cache_data["sentiment_strength"]) if cache_data["sentiment_strength"] else 0.5,
-                    "topics": cache_data["topics"] or [],
-                    "keywords": cache_data["keywords"] or [],
-                    "intent": cache_data["intent"] or "일반",
-                    "reply_focus": cache_data["reply_focus"] or [],
-                    "reply_avoid": cache_data["reply_avoid"] or [],
-                    "summary": cache_data["summary"] or "",
-                    "analysis_depth": "cache",
-                    "analysis_source": "cache",
-                    "model_used": cache_data["analysis_model"] or "cache"
-                }
+        # 히트 카운트 원자적 증가 (LFU 압축 점수에 사용, 다른 워커의 증가분 보존)
+        # 실패해도 이미 찾은 캐시 행은 그대로 사용 (OpenAI 재호출 방지)
+        try:
+            await execute_async(self.supabase.rpc("increment_cache_hit", {"p_content_hash": content_hash}))
         except Exception as e:
-            print(f"캐시 조회 실패: {e}")
+            print(f"캐시 히트 카운트 증가 실패: {e}")
 
-        return None
+        return self._cache_row_to_analysis(cache_data)
+
+    def _memory_cache_get(self, content_hash: str) -> Optional[Dict]:
+        """메모리 캐시 조회 (MEMORY_CACHE_TTL_SECONDS 가 지나면 버리고 DB 재조회)"""
+        entry = self.memory_cache.get(content_hash)
+        if entry is None:
+            return None
+
+        cache_data, loaded_at = entry
+        if time.monotonic() - loaded_at > MEMORY_CACHE_TTL_SECONDS:
+            self.memory_cache.pop(content_hash, None)
+            return None
+        self.memory_cache.move_to_end(content_hash)
+        return cache_data
+
+    def _memory_cache_put(self, content_hash: str, cache_data: Dict):
+        """메모리 캐시 추가 (만료 항목 → 가장 오래 안 쓴 항목 순으로 제거해 MEMORY_CACHE_SIZE 유지)"""
+        now = time.monotonic()
+        self.memory_cache.pop(content_hash, None)
+        while self.memory_cache:
+            _, (_, loaded_at) = next(iter(self.memory_cache.items()))
+            if now - loaded_at <= MEMORY_CACHE_TTL_SECONDS and len(self.memory_cache) < MEMORY_CACHE_SIZE:
+                break
+            self.memory_cache.popitem(last=False)
+        self.memory_cache[content_hash] = (cache_data, now)
+
+    def _cache_row_to_analysis(self, cache_data: Dict) -> Dict:
+        """캐시 행 → 분석 결과"""
+        return {
+            "success": True,
+            "sentiment": cache_data["sentiment"],
+            "sentiment_strength": float(cache_data["sentiment_strength"]) if cache_data["sentiment_strength"] else 0.5,
+            "topics": _json_list(cache_data["topics"]),
+            "keywords": _json_list(cache_data["keywords"]),
+            "intent": cache_data["intent"] or "일반",
+            "reply_focus": _json_list(cache_data["reply_focus"]),
+            "reply_avoid": _json_list(cache_data["reply_avoid"]),
+            "summary": cache_data["summary"] or "",
+            "analysis_depth": "cache",
+            "analysis_source": "cache",
+            "model_used": cache_data["analysis_model"] or "cache"
+        }
 
     async def _save_to_cache(self, content: str, analysis: Dict):
         """캐시 저장"""
@@ -353,28 +768,59 @@ JSON 형식으로만 응답하세요:
             return
 
         try:
-            content_hash = hashlib.sha256(content.encode()).hexdigest()
+            content_hash = self._content_hash(content)
             content_preview = content[:100] if len(content) > 100 else content
 
             cache_data = {
                 "content_hash": content_hash,
                 "content_preview": content_preview,
-                "sentiment": analysis["sentiment"],
-                "sentiment_strength": analysis["sentiment_strength"],
-                "topics": json.dumps(analysis["topics"]) if isinstance(analysis["topics"], list) else analysis["topics"],
-                "keywords": json.dumps(analysis["keywords"]) if isinstance(analysis["keywords"], list) else analysis["keywords"],
-                "intent": analysis.get("intent", "일반"),
-                "reply_focus": json.dumps(analysis.get("reply_focus", [])),
-                "reply_avoid": json.dumps(analysis.get("reply_avoid", [])),
-                "summary": analysis.get("summary", ""),
-                "analysis_model": analysis.get("model_used", "unknown"),
+                **self._cache_analysis_fields(analysis),
                 "hit_count": 0,
                 "last_used_at": "NOW()"
             }
 
             # Upsert (insert or update)
-            self.supabase.table("sentiment_analysis_cache")\
-                .upsert(cache_data, on_conflict="content_hash")\
-                .execute()
+            await execute_async(
+                self.supabase.table("sentiment_analysis_cache")\
+                    .upsert(cache_data, on_conflict="content_hash")
+            )
+            self.memory_cache.pop(content_hash, None)
         except Exception as e:
             print(f"캐시 저장 실패: {e}")
+
+    async def _upgrade_cache(self, content: str, analysis: Dict):
+        """기존 캐시 행의 분석 결과만 갱신 (hit_count / last_used_at 유지)"""
+        if not self.supabase:
+            return
+
+        content_hash = self._content_hash(content)
+        await execute_async(
+            self.supabase.table("sentiment_analysis_cache")\
+                .update(self._cache_analysis_fields(analysis))\
+                .eq("content_hash", content_hash)
+        )
+        self.memory_cache.pop(content_hash, None)
+
+    def _cache_analysis_fields(self, analysis: Dict) -> Dict:
+        """분석 결과 → 캐시 컬럼"""
+        return {
+            "sentiment": analysis["sentiment"],
+            "sentiment_strength": analysis["sentiment_strength"],
+            "topics": json.dumps(analysis["topics"]) if isinstance(analysis["topics"], list) else analysis["topics"],
+            "keywords": json.dumps(analysis["keywords"]) if isinstance(analysis["keywords"], list) else analysis["keywords"],
+            "intent": analysis.get("intent", "일반"),
+            "reply_focus": json.dumps(analysis.get("reply_focus", [])),
+            "reply_avoid": json.dumps(analysis.get("reply_avoid", [])),
+            "summary": analysis.get("summary", ""),
+            "analysis_model": analysis.get("model_used", "unknown")
+        }
+
+
+def _json_list(value) -> List:
+    """JSONB 컬럼 값 → 리스트 (json.dumps 로 저장된 문자열도 디코딩)"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [value]
+    return value if isinstance(value, list) else []
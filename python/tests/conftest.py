@@ -0,0 +1,5 @@
+import os
+import sys
+
+# services / utils 를 python/ 기준으로 import (uvicorn main:app 실행 방식과 동일)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,173 @@
+"""
+테스트용 OpenAI / Supabase 대체 객체 (네트워크 없이 서비스 로직 검증)
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+def make_completion(content: str, finish_reason: str = "stop", usage: Optional[Dict] = None):
+    """chat.completions.create 응답 형태"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+        usage=SimpleNamespace(**usage) if usage else None
+    )
+
+
+class FakeStream:
+    """stream=True 응답 형태 (텍스트 조각을 chunk.choices[0].delta.content 로 내보냄, 여러 번 순회 가능)"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = list(texts)
+
+    async def __aiter__(self):
+        for text in self.texts:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeOpenAI:
+    """준비된 응답을 순서대로 돌려주는 AsyncOpenAI 대체"""
+
+    def __init__(self, responses: List, delays: Optional[List[float]] = None):
+        self.responses = list(responses)
+        self.delays = list(delays or [])
+        self.calls: List[Dict] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.delays:
+            await asyncio.sleep(self.delays.pop(0))
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def close(self):
+        pass
+
+
+class FakeQuery:
+    """supabase-py 테이블 쿼리 체인 대체 (eq / gt / gte / lte / in_ / order / limit 만 해석)"""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.payload = None
+        self.filters = []
+        self.order_key = None
+        self.order_desc = False
+        self.limit_count = None
+        self.upsert_key = None
+
+    def select(self, *args, **kwargs):
+        self.action = "select"
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: Optional[str] = None):
+        self.action, self.payload, self.upsert_key = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def gt(self, key, value):
+        self.filters.append(lambda row: row.get(key) is not None and row.get(key) > value)
+        return self
+
+    def gte(self, key, value):
+        self.filters.append(lambda row: row.get(key) is not None and row.get(key) >= value)
+        return self
+
+    def lte(self, key, value):
+        self.filters.append(lambda row: row.get(key) is not None and row.get(key) <= value)
+        return self
+
+    def in_(self, key, values):
+        self.filters.append(lambda row: row.get(key) in values)
+        return self
+
+    def order(self, key, desc: bool = False):
+        self.order_key, self.order_desc = key, desc
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def execute(self):
+        self.db.calls.append((self.table, self.action))
+        rows = self.db.tables.setdefault(self.table, [])
+
+        if self.action in ("insert", "upsert"):
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            key = self.upsert_key
+            for item in payload:
+                existing = next((row for row in rows if key and row.get(key) == item.get(key)), None)
+                if existing is not None:
+                    existing.update(item)
+                else:
+                    rows.append(dict(item))
+            return SimpleNamespace(data=payload, count=None)
+
+        matched = [row for row in rows if all(f(row) for f in self.filters)]
+        if self.action == "update":
+            for row in matched:
+                row.update(self.payload)
+            return SimpleNamespace(data=matched, count=None)
+        if self.action == "delete":
+            self.db.tables[self.table] = [row for row in rows if row not in matched]
+            return SimpleNamespace(data=matched, count=None)
+
+        if self.order_key:
+            matched.sort(key=lambda row: row.get(self.order_key), reverse=self.order_desc)
+        if self.limit_count is not None:
+            matched = matched[:self.limit_count]
+        return SimpleNamespace(data=[dict(row) for row in matched], count=len(matched))
+
+
+class FakeRpc:
+    def __init__(self, db: "FakeSupabase", name: str, params: Dict):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.db.calls.append(("rpc", self.name))
+        handler = self.db.rpc_handlers.get(self.name)
+        return SimpleNamespace(data=handler(self.db, self.params) if handler else None)
+
+
+class FakeSupabase:
+    """메모리 테이블 기반 supabase Client 대체 (rpc 는 rpc_handlers 로 흉내)"""
+
+    def __init__(self, rpc_handlers: Optional[Dict] = None):
+        self.tables: Dict[str, List[Dict]] = {}
+        self.rpc_handlers = rpc_handlers or {}
+        self.calls: List = []
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+
+def json_completion(payload: Dict, **kwargs):
+    return make_completion(json.dumps(payload, ensure_ascii=False), **kwargs)
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from fakes import FakeOpenAI, FakeQuery, FakeSupabase, make_completion
+from services.ai_service_v2 import AIServiceV2
+
+
+DB_LATENCY = 0.1
+CONCURRENCY = 8
+
+
+class SlowQuery(FakeQuery):
+    def execute(self):
+        # 동기 HTTP 왕복 (이벤트 루프에서 실행되면 요청이 모두 직렬화됨)
+        time.sleep(DB_LATENCY)
+        return super().execute()
+
+
+class SlowSupabase(FakeSupabase):
+    def table(self, name):
+        return SlowQuery(self, name)
+
+
+def test_supabase_calls_do_not_block_event_loop():
+    db = SlowSupabase()
+    service = AIServiceV2(None, supabase_client=db, openai_client=FakeOpenAI([make_completion("감사합니다.")]))
+    reviews = [f"커피 맛있어요 {i}" for i in range(CONCURRENCY)]
+
+    async def run_batch():
+        return await asyncio.gather(*(
+            service.generate_reply(review, {"user_id": "store-1", "save_to_db": True})
+            for review in reviews
+        ))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_batch())
+    elapsed = time.perf_counter() - start
+
+    assert all(result["success"] for result in results)
+    assert len(db.tables["reply_history"]) == CONCURRENCY
+    # 요청당 DB 왕복 3회 (캐시 조회, 캐시 저장, 이력 저장)를 직렬로 하면 CONCURRENCY * 3 * DB_LATENCY
+    assert elapsed < CONCURRENCY * 3 * DB_LATENCY / 2
@@ -0,0 +1,104 @@
+import json
+
+from fakes import FakeSupabase
+from services.bulk_rescorer import fetch_reply_history, rescore_parallel, rescore_reply_history, rescore_serial
+
+
+REVIEWS = [
+    "커피 맛있고 분위기 좋아요! 사장님도 친절하세요 최고",
+    "직원이 너무 불친절하고 웨이팅도 오래 걸렸어요.",
+    "가격이 좀 비싼 편이지만 재료가 신선해요.",
+    "화장실이 지저분하고 테이블도 끈적거렸어요.",
+    "그럭저럭 무난했어요."
+]
+
+
+def apply_rescore_rpc(db, params):
+    updated = 0
+    for item in params["p_rows"]:
+        for row in db.tables["reply_history"]:
+            if row["id"] == item["id"]:
+                row.update(item)
+                updated += 1
+    return updated
+
+
+def replace_summary_rpc(db, params):
+    summary = [row for row in db.tables.get("sentiment_summary", []) if row["user_id"] != params["p_user_id"]]
+    summary.extend(params["p_rows"])
+    db.tables["sentiment_summary"] = summary
+    return len(params["p_rows"])
+
+
+def make_db():
+    db = FakeSupabase({
+        "apply_reply_history_rescore": apply_rescore_rpc,
+        "replace_sentiment_summary": replace_summary_rpc
+    })
+    # 같은 created_at 을 가진 행이 페이지 경계에 걸쳐 있어도 누락/중복 없어야 함
+    db.tables["reply_history"] = [
+        {"id": f"id-{i:02d}", "user_id": "store-1", "review_content": review, "created_at": "2026-01-01T00:00:00+00:00"}
+        for i, review in enumerate(REVIEWS)
+    ]
+    return db
+
+
+def test_fetch_reply_history_keyset_pages_every_row_once():
+    db = make_db()
+
+    rows = list(fetch_reply_history(db, page_size=2))
+
+    assert [row["id"] for row in rows] == [f"id-{i:02d}" for i in range(len(REVIEWS))]
+
+
+def test_rescore_reply_history_writes_one_batch_per_chunk():
+    db = make_db()
+
+    result = rescore_reply_history(db, workers=2, chunk_size=2)
+
+    assert result["processed"] == len(REVIEWS)
+    assert result["updated"] == len(REVIEWS)
+    assert db.calls.count(("rpc", "apply_reply_history_rescore")) == 3
+    assert ("reply_history", "update") not in db.calls
+
+    scored = {row["id"]: row for row in db.tables["reply_history"]}
+    assert scored["id-00"]["sentiment"] == "positive"
+    assert isinstance(json.loads(scored["id-00"]["topics"]), list)
+
+
+def test_rescore_reply_history_dry_run_skips_writes():
+    db = make_db()
+
+    result = rescore_reply_history(db, workers=1, chunk_size=2, dry_run=True)
+
+    assert result["processed"] == len(REVIEWS)
+    assert result["updated"] == 0
+    assert ("rpc", "apply_reply_history_rescore") not in db.calls
+    assert ("rpc", "replace_sentiment_summary") not in db.calls
+
+
+def test_parallel_output_matches_serial():
+    rows = make_db().tables["reply_history"] * 3
+
+    assert list(rescore_parallel(rows, workers=2, chunk_size=2)) == list(rescore_serial(rows))
+
+
+def test_rescore_rebuilds_sentiment_summary():
+    db = make_db()
+    # 재채점 전 사전으로 집계된 값은 교체되어야 함
+    db.tables["sentiment_summary"] = [
+        {"user_id": "store-1", "bucket_date": "2026-01-01", "dimension": "sentiment", "key": "neutral", "count": 99}
+    ]
+
+    result = rescore_reply_history(db, workers=1, chunk_size=2)
+
+    summary = db.tables["sentiment_summary"]
+    sentiments = {row["key"]: row["count"] for row in summary if row["dimension"] == "sentiment"}
+    scored = db.tables["reply_history"]
+    assert sum(sentiments.values()) == len(REVIEWS)
+    assert sentiments == {
+        sentiment: sum(1 for row in scored if row["sentiment"] == sentiment)
+        for sentiment in {row["sentiment"] for row in scored}
+    }
+    assert {row["bucket_date"] for row in summary} == {"2026-01-01"}
+    assert result["summary_rows"] == len(summary)
@@ -0,0 +1,177 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fakes import FakeSupabase
+from services.cache_maintenance import CACHE_TABLE, CacheMaintenance
+from services.sentiment_analyzer import MEMORY_CACHE_SIZE, MEMORY_CACHE_TTL_SECONDS, SentimentAnalyzer
+
+
+NOW = datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+
+def cache_row(content_hash: str, hit_count: int, days_ago: float) -> dict:
+    return {
+        "content_hash": content_hash,
+        "sentiment": "positive",
+        "sentiment_strength": 0.8,
+        "topics": ["맛/품질"],
+        "keywords": ["맛있"],
+        "intent": "칭찬",
+        "reply_focus": [],
+        "reply_avoid": [],
+        "summary": "",
+        "analysis_model": "gpt-4o-mini",
+        "hit_count": hit_count,
+        "last_used_at": (NOW - timedelta(days=days_ago)).isoformat(),
+        "created_at": (NOW - timedelta(days=days_ago)).isoformat()
+    }
+
+
+def recording_rpc(received, result):
+    """RPC 에 전달된 파라미터를 기록하고 정해진 삭제 건수를 반환 (삭제 규칙 자체는 migration 013 SQL 몫)"""
+    def handler(db, params):
+        received.append(params)
+        return result
+    return handler
+
+
+def increment_rpc(db, params):
+    for row in db.tables.get(CACHE_TABLE, []):
+        if row["content_hash"] == params["p_content_hash"]:
+            row["hit_count"] = (row.get("hit_count") or 0) + 1
+    return None
+
+
+def make_db(rows, rpc_handlers=None):
+    db = FakeSupabase({"increment_cache_hit": increment_rpc, **(rpc_handlers or {})})
+    db.tables[CACHE_TABLE] = rows
+    return db
+
+
+def test_expire_sends_ttl_and_returns_deleted_count():
+    received = []
+    db = make_db([], {"expire_sentiment_cache": recording_rpc(received, 3)})
+
+    deleted = asyncio.run(CacheMaintenance(db, ttl_days=30).expire())
+
+    assert deleted == 3
+    assert received == [{"p_ttl_days": 30}]
+    assert db.calls == [("rpc", "expire_sentiment_cache")]
+
+
+def test_compact_sends_bounds_and_returns_deleted_count():
+    received = []
+    db = make_db([], {"compact_sentiment_cache": recording_rpc(received, 2)})
+
+    deleted = asyncio.run(CacheMaintenance(db, max_rows=100, half_life_days=7.0).compact())
+
+    assert deleted == 2
+    assert received == [{"p_max_rows": 100, "p_half_life_days": 7.0}]
+    assert db.calls == [("rpc", "compact_sentiment_cache")]
+
+
+def test_run_reports_both_counts_and_null_result_as_zero():
+    db = make_db([], {
+        "expire_sentiment_cache": recording_rpc([], 4),
+        "compact_sentiment_cache": recording_rpc([], None)
+    })
+
+    result = asyncio.run(CacheMaintenance(db).run())
+
+    assert result["expired"] == 4
+    assert result["compacted"] == 0
+    assert db.calls == [("rpc", "expire_sentiment_cache"), ("rpc", "compact_sentiment_cache")]
+
+
+def test_expire_and_compact_failure_return_zero():
+    class BrokenSupabase(FakeSupabase):
+        def rpc(self, name, params):
+            raise ConnectionError("down")
+
+    assert asyncio.run(CacheMaintenance(BrokenSupabase()).expire()) == 0
+    assert asyncio.run(CacheMaintenance(BrokenSupabase()).compact()) == 0
+
+
+def test_load_hot_entries_ranks_by_recency_weighted_hits():
+    db = make_db([
+        cache_row("old_popular", hit_count=40, days_ago=90),
+        cache_row("hot", hit_count=20, days_ago=1),
+        cache_row("warm", hit_count=5, days_ago=2)
+    ])
+
+    rows = asyncio.run(CacheMaintenance(db).load_hot_entries(2, now=NOW))
+
+    assert [row["content_hash"] for row in rows] == ["hot", "warm"]
+
+
+def test_cache_hit_increments_atomically():
+    analyzer = SentimentAnalyzer(None)
+    content_hash = analyzer._content_hash("맛있어요")
+    db = make_db([cache_row(content_hash, hit_count=7, days_ago=1)])
+    analyzer.supabase = db
+
+    asyncio.run(analyzer._check_cache("맛있어요"))
+    # 다른 워커의 히트
+    db.tables[CACHE_TABLE][0]["hit_count"] += 3
+    asyncio.run(analyzer._check_cache("맛있어요"))
+
+    assert db.tables[CACHE_TABLE][0]["hit_count"] == 12
+    assert (CACHE_TABLE, "update") not in db.calls
+
+
+def test_memory_cache_entry_expires():
+    analyzer = SentimentAnalyzer(None)
+    content_hash = analyzer._content_hash("맛있어요")
+    db = make_db([cache_row(content_hash, hit_count=0, days_ago=1)])
+    analyzer.supabase = db
+
+    asyncio.run(analyzer._check_cache("맛있어요"))
+    # 다른 워커가 압축으로 삭제
+    db.tables[CACHE_TABLE] = []
+    assert asyncio.run(analyzer._check_cache("맛있어요")) is not None
+
+    row, loaded_at = analyzer.memory_cache[content_hash]
+    analyzer.memory_cache[content_hash] = (row, loaded_at - MEMORY_CACHE_TTL_SECONDS - 1)
+    assert asyncio.run(analyzer._check_cache("맛있어요")) is None
+
+
+def test_cache_row_returned_when_hit_increment_fails():
+    analyzer = SentimentAnalyzer(None)
+    content_hash = analyzer._content_hash("맛있어요")
+
+    def broken_increment(db, params):
+        raise ConnectionError("down")
+
+    analyzer.supabase = make_db([cache_row(content_hash, hit_count=0, days_ago=1)], {"increment_cache_hit": broken_increment})
+
+    analysis = asyncio.run(analyzer._check_cache("맛있어요"))
+
+    assert analysis is not None
+    assert analysis["analysis_source"] == "cache"
+
+
+def test_warm_start_then_memory_hit_and_lru_eviction():
+    analyzer = SentimentAnalyzer(None)
+    warm_hash = analyzer._content_hash("맛있어요")
+    new_hash = analyzer._content_hash("친절해요")
+    rows = [cache_row(warm_hash, hit_count=20, days_ago=1), cache_row(new_hash, hit_count=0, days_ago=200)]
+    rows += [cache_row(f"filler-{i}", hit_count=1, days_ago=30) for i in range(MEMORY_CACHE_SIZE)]
+    db = make_db(rows)
+    analyzer.supabase = db
+
+    assert asyncio.run(analyzer.warm_start()) == MEMORY_CACHE_SIZE
+    assert len(analyzer.memory_cache) == MEMORY_CACHE_SIZE
+
+    # 워밍업된 항목은 DB 조회 없이 메모리에서 응답
+    db.calls.clear()
+    assert asyncio.run(analyzer._check_cache("맛있어요")) is not None
+    assert (CACHE_TABLE, "select") not in db.calls
+
+    # 가득 찬 메모리 캐시에도 DB 에서 찾은 행이 추가되고, 가장 오래 안 쓴 항목이 밀려남
+    assert new_hash not in analyzer.memory_cache
+    least_recent = next(iter(analyzer.memory_cache))
+    assert asyncio.run(analyzer._check_cache("친절해요")) is not None
+    assert new_hash in analyzer.memory_cache
+    assert least_recent not in analyzer.memory_cache
+    assert warm_hash in analyzer.memory_cache
+    assert len(analyzer.memory_cache) == MEMORY_CACHE_SIZE
@@ -0,0 +1,124 @@
+import asyncio
+
+from fakes import FakeOpenAI, FakeSupabase, json_completion
+from services import sentiment_analyzer
+from services.hedging import LatencyTracker
+from services.refinement_queue import SQLiteRefinementQueue
+from services.sentiment_analyzer import DEFAULT_HEDGE_FRACTION, SentimentAnalyzer
+
+
+MESSAGES = [{"role": "user", "content": "직원이 불친절했어요"}]
+NEGATIVE_REVIEW = "직원이 너무 불친절하고 웨이팅도 오래 걸렸어요. 실망입니다."
+ANALYSIS_JSON = {"sentiment": "negative", "sentiment_strength": 0.8, "topics": ["서비스"], "keywords": ["불친절"]}
+
+
+def test_default_hedge_delay_follows_budget():
+    analyzer = SentimentAnalyzer(None, latency_budget_ms=300)
+
+    assert analyzer.latency_tracker.percentile(0.9) == 300 * DEFAULT_HEDGE_FRACTION
+
+
+def test_hedge_fires_under_short_budget_and_records_cancelled_primary():
+    # 첫 요청 0.5초, 헤지 요청 0.01초 (예산 400ms → 기본 헤지 지연 200ms)
+    client = FakeOpenAI([json_completion(ANALYSIS_JSON)], delays=[0.5, 0.01])
+    analyzer = SentimentAnalyzer(None, openai_client=client, latency_budget_ms=400)
+
+    ai_result, usage = asyncio.run(analyzer._hedged_deep_request(MESSAGES, 500))
+
+    assert ai_result["sentiment"] == "negative"
+    # 취소된 첫 요청의 프롬프트 토큰도 사용량에 포함
+    assert usage["prompt_tokens"] == 2 * analyzer.token_estimator.estimate_prompt(MESSAGES)
+    assert analyzer.slo_metrics["hedges_fired"] == 1
+    assert analyzer.slo_metrics["hedge_wins"] == 1
+
+    # 이긴 헤지 요청 + 취소된 첫 요청 (헤지 지연 이상) 모두 기록
+    samples = sorted(analyzer.latency_tracker.samples)
+    assert len(samples) == 2
+    assert samples[1] >= 200
+
+
+def test_percentile_uses_samples_after_min_samples():
+    tracker = LatencyTracker(default_ms=800.0, min_samples=5)
+    for latency in (100, 120, 140, 160, 900):
+        tracker.record(latency)
+
+    assert tracker.percentile(0.9) == 900
+    assert tracker.percentile(0.5) == 140
+
+
+def slow_analyzer(delay: float, **kwargs) -> SentimentAnalyzer:
+    """모든 AI 요청이 delay 초 걸리는 지연 예산 100ms 분석기"""
+    client = FakeOpenAI([json_completion(ANALYSIS_JSON)], delays=[delay] * 8)
+    return SentimentAnalyzer(None, supabase_client=FakeSupabase(), openai_client=client, latency_budget_ms=100, **kwargs)
+
+
+def test_concurrent_deadline_fallbacks_are_each_refined_and_billed():
+    billed = []
+
+    async def on_background_usage(meta, usage):
+        billed.append((meta["user_id"], usage["total_tokens"]))
+
+    analyzer = slow_analyzer(0.3, on_background_usage=on_background_usage)
+
+    async def scenario():
+        results = await asyncio.gather(
+            analyzer.analyze(NEGATIVE_REVIEW, refinement_meta={"user_id": "store-1"}),
+            analyzer.analyze(NEGATIVE_REVIEW, refinement_meta={"user_id": "store-2"})
+        )
+        assert all(result["refinement_queued"] for result in results)
+        assert len(analyzer._background_tasks) == 2
+        await analyzer.aclose()
+
+    asyncio.run(scenario())
+
+    assert analyzer.slo_metrics["deadline_fallbacks"] == 2
+    assert analyzer.slo_metrics["refinements_completed"] == 2
+    assert not analyzer._background_tasks
+    assert sorted(user_id for user_id, _ in billed) == ["store-1", "store-2"]
+    assert analyzer.background_usage["total_tokens"] == sum(tokens for _, tokens in billed)
+
+
+def test_deadline_fallback_goes_to_refinement_queue(tmp_path):
+    queue = SQLiteRefinementQueue(str(tmp_path / "queue.db"))
+    analyzer = slow_analyzer(0.3, refinement_queue=queue)
+
+    async def scenario():
+        analysis = await analyzer.analyze(NEGATIVE_REVIEW)
+        await asyncio.sleep(0)
+        return analysis
+
+    analysis = asyncio.run(scenario())
+
+    assert analysis["refinement_queued"]
+    assert not analyzer._background_tasks
+    assert analyzer.slo_metrics["refinements_queued"] == 1
+    assert queue.size() == 1
+    # 취소된 요청의 프롬프트 토큰은 백그라운드 사용량으로 기록
+    assert analyzer.background_usage["prompt_tokens"] > 0
+    queue.close()
+
+
+def test_background_refinements_are_bounded(monkeypatch):
+    monkeypatch.setattr(sentiment_analyzer, "MAX_BACKGROUND_REFINEMENTS", 0)
+    analyzer = slow_analyzer(0.3)
+
+    analysis = asyncio.run(analyzer.analyze(NEGATIVE_REVIEW))
+
+    assert not analysis["refinement_queued"]
+    assert analyzer.slo_metrics["refinements_dropped"] == 1
+    assert not analyzer._background_tasks
+
+
+def test_aclose_cancels_unfinished_refinements():
+    analyzer = slow_analyzer(5.0)
+
+    async def scenario():
+        await analyzer.analyze(NEGATIVE_REVIEW)
+        task = next(iter(analyzer._background_tasks))
+        await analyzer.aclose(timeout=0.05)
+        return task
+
+    task = asyncio.run(scenario())
+
+    assert task.cancelled()
+    assert analyzer.slo_metrics["refinements_completed"] == 0
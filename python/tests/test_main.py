@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fakes import FakeOpenAI, FakeStream, FakeSupabase, make_completion
+import main
+from services.ai_service_v2 import AIServiceV2
+from services.sentiment_analyzer import SentimentAnalyzer
+from utils.auth import create_access_token
+
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+AUTH = {"Authorization": f"Bearer {create_access_token({'id': USER_ID, 'username': 'store'})}"}
+
+REVIEWS = [
+    "커피 맛있고 직원분들도 친절해요",
+    "직원이 너무 불친절하고 웨이팅도 오래 걸렸어요.",
+    "그럭저럭 무난했어요."
+]
+
+
+@pytest.fixture
+def db():
+    return FakeSupabase()
+
+
+def make_client(db, openai_client) -> TestClient:
+    service = AIServiceV2(None, supabase_client=db, openai_client=openai_client)
+    main.app.dependency_overrides[main.get_ai_service] = lambda: service
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def client(db):
+    yield make_client(db, FakeOpenAI([make_completion("감사합니다.")]))
+    main.app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def stream_client(db):
+    yield make_client(db, FakeOpenAI([FakeStream(["방문해 주셔서 ", "감사합니다."])]))
+    main.app.dependency_overrides.clear()
+
+
+def test_missing_token_is_401(client):
+    response = client.post("/api/reply/generate", json={"review_content": REVIEWS[0]})
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "인증이 필요합니다."
+
+
+def test_bad_token_is_401(client):
+    response = client.post(
+        "/api/reply/generate",
+        json={"review_content": REVIEWS[0]},
+        headers={"Authorization": "Bearer not-a-jwt"}
+    )
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "유효하지 않은 토큰입니다."
+
+
+def test_batch_ndjson_lines_carry_request_index(client):
+    response = client.post(
+        "/api/reply/batch",
+        json={"reviews": [{"review_content": review} for review in REVIEWS]},
+        headers=AUTH
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert sorted(line["index"] for line in lines) == list(range(len(REVIEWS)))
+
+    analyzer = SentimentAnalyzer(None)
+    for line in lines:
+        expected = asyncio.run(analyzer.analyze(REVIEWS[line["index"]]))
+        assert line["sentiment"] == expected["sentiment"]
+
+
+def test_stream_sse_events_end_with_done(stream_client):
+    response = stream_client.post("/api/reply/stream", json={"review_content": REVIEWS[0]}, headers=AUTH)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    events = [frame.split("\n")[0] for frame in frames]
+    assert events[0] == "event: analysis"
+    assert events[1:-1] == ["event: delta"] * 2
+    assert events[-1] == "event: done"
+
+    done = json.loads(frames[-1].split("\n")[1][len("data: "):])
+    assert done["success"]
+    assert "reply" in done
+
+
+def test_quota_exceeded_is_429(client, db):
+    db.tables["usage_quotas"] = [{"user_id": USER_ID, "daily_reply_limit": 1}]
+    db.rpc_handlers["get_today_usage"] = lambda db, params: [{"requests": 1, "quota_limit": 1, "quota_remaining": 0}]
+    db.rpc_handlers["get_current_month_usage"] = lambda db, params: [{"requests": 1, "tokens": 500, "cost": 0.0}]
+
+    response = client.post("/api/reply/generate", json={"review_content": REVIEWS[0]}, headers=AUTH)
+
+    assert response.status_code == 429
+    assert response.json()["detail"] == "일일 답글 생성 한도(1개)를 초과했습니다."
+    assert "reply_history" not in db.tables
+
+
+def test_summary_returns_saved_counts(client, db):
+    db.tables["sentiment_summary"] = [
+        {"user_id": USER_ID, "bucket_date": "2026-01-03", "dimension": "sentiment", "key": "positive", "count": 5}
+    ]
+
+    response = client.get("/api/summary", params={"start": "2026-01-01", "end": "2026-01-31"}, headers=AUTH)
+
+    assert response.status_code == 200
+    assert response.json()["sentiment"] == {"positive": 5}
+    assert response.json()["daily"] == {"2026-01-03": {"positive": 5}}
+
+
+def test_summary_db_failure_is_not_empty_counts(client, db):
+    def broken_table(name):
+        raise ConnectionError("down")
+
+    db.table = broken_table
+
+    response = client.get("/api/summary", headers=AUTH)
+
+    assert response.status_code == 503
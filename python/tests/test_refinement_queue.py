@@ -0,0 +1,193 @@
+import asyncio
+import time
+
+import pytest
+
+from fakes import FakeOpenAI, FakeSupabase, json_completion
+from services.refinement_queue import PRIORITY_DEEP, PRIORITY_QUICK, RefinementWorker, SQLiteRefinementQueue
+from services.sentiment_analyzer import SentimentAnalyzer
+
+
+NEGATIVE_REVIEW = "직원이 너무 불친절하고 웨이팅도 오래 걸렸어요. 실망입니다."
+ANALYSIS_JSON = {
+    "sentiment": "negative",
+    "sentiment_strength": 0.9,
+    "topics": ["서비스", "대기시간"],
+    "keywords": ["불친절", "웨이팅"],
+    "intent": "불만",
+    "reply_focus": ["사과"],
+    "reply_avoid": ["변명"],
+    "summary": "응대와 대기 불만"
+}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteRefinementQueue(str(tmp_path / "queue.db"), max_size=2)
+    yield queue
+    queue.close()
+
+
+def row_count(queue) -> int:
+    return queue._conn.execute("SELECT COUNT(*) FROM refinement_jobs").fetchone()[0]
+
+
+def test_put_claim_complete_deletes_job(queue):
+    assert queue.put("리뷰 A", PRIORITY_QUICK, {"user_id": "store-1"})
+
+    jobs = queue.claim(1)
+    assert jobs[0]["content"] == "리뷰 A"
+    assert jobs[0]["meta"] == {"user_id": "store-1"}
+    assert jobs[0]["attempts"] == 1
+
+    queue.complete(jobs[0])
+    assert row_count(queue) == 0
+
+
+def test_put_existing_job_raises_priority_without_new_row(queue):
+    queue.put("리뷰 A", PRIORITY_QUICK)
+    queue.put("리뷰 B", PRIORITY_QUICK)
+
+    # 가득 찬 큐라도 이미 대기 중인 리뷰는 True
+    assert queue.put("리뷰 B", PRIORITY_DEEP)
+    assert queue.size() == 2
+    assert queue.claim(1)[0]["content"] == "리뷰 B"
+
+
+def test_put_returns_false_when_full(queue):
+    assert queue.put("리뷰 A")
+    assert queue.put("리뷰 B")
+    assert not queue.put("리뷰 C")
+
+
+def test_failed_jobs_leave_the_bound_and_are_purged(queue):
+    queue.put("리뷰 A")
+    job = queue.claim(1)[0]
+
+    queue.fail(job, "timeout")
+    assert queue.claim(1) == []  # 백오프 중
+
+    job["attempts"] = queue.max_attempts
+    queue.fail(job, "timeout")
+    assert queue.size() == 0
+    assert row_count(queue) == 1
+
+    queue.failed_retention_days = 0
+    assert queue.purge() == 1
+    assert row_count(queue) == 0
+
+
+def test_failed_job_can_be_queued_again(queue):
+    queue.put("리뷰 A")
+    job = queue.claim(1)[0]
+    job["attempts"] = queue.max_attempts
+    queue.fail(job, "timeout")
+
+    assert queue.put("리뷰 A", PRIORITY_DEEP)
+    job = queue.claim(1)[0]
+    assert job["priority"] == PRIORITY_DEEP
+    assert job["attempts"] == 1
+
+
+def test_stale_running_job_past_max_attempts_is_failed_not_reclaimed(queue):
+    queue.visibility_timeout = 0
+    queue.put("리뷰 A")
+
+    # 처리 중 프로세스가 죽어 complete/fail 이 호출되지 않는 작업
+    for attempt in range(1, queue.max_attempts + 1):
+        jobs = queue.claim(1)
+        assert [job["attempts"] for job in jobs] == [attempt]
+
+    assert queue.claim(1) == []
+    assert queue.size() == 0
+    assert queue._conn.execute("SELECT status FROM refinement_jobs").fetchone()[0] == "failed"
+
+
+def test_worker_makes_progress_under_steady_traffic(queue):
+    client = FakeOpenAI([json_completion(ANALYSIS_JSON)])
+    analyzer = make_analyzer(queue, client)
+    queue.put(NEGATIVE_REVIEW, PRIORITY_DEEP)
+
+    async def scenario():
+        analyzer.active_requests = 10
+        worker = RefinementWorker(analyzer, queue, idle_threshold=2, max_idle_wait=0.05, poll_interval=0.01)
+        worker.start()
+        await asyncio.sleep(0.3)
+        await worker.stop()
+        return worker
+
+    worker = asyncio.run(scenario())
+
+    assert worker.stats["refined"] == 1
+    assert row_count(queue) == 0
+
+
+def make_analyzer(queue, client) -> SentimentAnalyzer:
+    return SentimentAnalyzer(
+        None,
+        supabase_client=FakeSupabase(),
+        openai_client=client,
+        refinement_queue=queue,
+        defer_deep_analysis=True
+    )
+
+
+def test_deferred_review_is_served_rule_based_then_refined(queue):
+    client = FakeOpenAI([json_completion(ANALYSIS_JSON)])
+    analyzer = make_analyzer(queue, client)
+
+    analysis = asyncio.run(analyzer.analyze(NEGATIVE_REVIEW))
+    assert analysis["analysis_source"] == "rule-based"
+    assert analysis["refinement_queued"]
+    assert client.calls == []
+
+    worker = RefinementWorker(analyzer, queue)
+    assert asyncio.run(worker.run_once()) == 1
+    assert row_count(queue) == 0
+
+    cache_row = analyzer.supabase.tables["sentiment_analysis_cache"][0]
+    assert cache_row["analysis_model"] == "gpt-4o-mini"
+    assert cache_row["summary"] == "응대와 대기 불만"
+
+
+def test_full_queue_falls_back_to_synchronous_deep_analysis(tmp_path):
+    queue = SQLiteRefinementQueue(str(tmp_path / "full.db"), max_size=0)
+    client = FakeOpenAI([json_completion(ANALYSIS_JSON)])
+    analyzer = make_analyzer(queue, client)
+
+    analysis = asyncio.run(analyzer.analyze(NEGATIVE_REVIEW))
+
+    assert analysis["analysis_source"] == "ai"
+    assert len(client.calls) == 1
+    assert analyzer.supabase.tables["sentiment_analysis_cache"][0]["analysis_model"] == "gpt-4o-mini"
+    queue.close()
+
+
+def test_quick_enqueue_does_not_block_response(queue):
+    class SlowQueue:
+        def __init__(self, inner):
+            self.inner = inner
+            self.started = []
+
+        def put(self, *args):
+            self.started.append(args[0])
+            time.sleep(0.3)
+            return self.inner.put(*args)
+
+    slow_queue = SlowQueue(queue)
+    analyzer = make_analyzer(slow_queue, FakeOpenAI([json_completion(ANALYSIS_JSON)]))
+    analyzer.defer_deep_analysis = False
+
+    async def scenario():
+        start = time.perf_counter()
+        analysis = await analyzer.analyze("맛있어요 최고")
+        elapsed = time.perf_counter() - start
+        await analyzer.aclose()
+        return analysis, elapsed
+
+    analysis, elapsed = asyncio.run(scenario())
+
+    assert analysis["analysis_source"] == "rule-based"
+    assert elapsed < 0.3
+    assert slow_queue.started == ["맛있어요 최고"]
+    assert queue.size() == 1
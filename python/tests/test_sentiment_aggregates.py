@@ -0,0 +1,160 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from fakes import FakeOpenAI, FakeSupabase, make_completion
+from services.ai_service_v2 import AIServiceV2
+from services.sentiment_aggregates import MAX_FLUSH_ATTEMPTS, MAX_KEY_LENGTH, SentimentAggregator
+from services.sentiment_analyzer import SentimentAnalyzer
+
+
+REVIEW = "커피 맛있고 직원분들도 친절해요"
+REPLY = "따뜻한 말씀 감사합니다. 다음에도 맛있는 커피로 보답하겠습니다."
+
+
+def cached_db(content: str) -> FakeSupabase:
+    """_save_to_cache 가 저장한 형태 그대로의 캐시 행 (topics/keywords 는 JSON 문자열)"""
+    analyzer = SentimentAnalyzer(None)
+    db = FakeSupabase()
+    db.tables["sentiment_analysis_cache"] = [{
+        "content_hash": analyzer._content_hash(content),
+        "hit_count": 0,
+        **analyzer._cache_analysis_fields({
+            "sentiment": "positive",
+            "sentiment_strength": 0.9,
+            "topics": ["맛/품질", "서비스"],
+            "keywords": ["맛있", "친절"],
+            "model_used": "gpt-4o-mini"
+        })
+    }]
+    return db
+
+
+def test_cache_hit_analysis_records_whole_topics():
+    analyzer = SentimentAnalyzer(None, supabase_client=cached_db(REVIEW))
+    aggregator = SentimentAggregator()
+
+    analysis = asyncio.run(analyzer.analyze(REVIEW))
+    aggregator.record("store-1", analysis)
+
+    assert analysis["analysis_source"] == "cache"
+    assert analysis["topics"] == ["맛/품질", "서비스"]
+    topics = {key for (_, _, dimension, key) in aggregator.pending if dimension == "topic"}
+    assert topics == {"맛/품질", "서비스"}
+
+
+def test_record_decodes_json_string_topics():
+    aggregator = SentimentAggregator()
+
+    aggregator.record("store-1", {"sentiment": "positive", "topics": '["맛/품질", "서비스"]'})
+
+    topics = {key for (_, _, dimension, key) in aggregator.pending if dimension == "topic"}
+    assert topics == {"맛/품질", "서비스"}
+
+
+def make_service(db: FakeSupabase) -> AIServiceV2:
+    return AIServiceV2(None, supabase_client=db, openai_client=FakeOpenAI([make_completion(REPLY)]))
+
+
+def test_aggregate_recorded_only_with_saved_history():
+    db = cached_db(REVIEW)
+    service = make_service(db)
+
+    asyncio.run(service.generate_reply(REVIEW, {"user_id": "store-1", "save_to_db": False}))
+    assert not service.aggregator.pending
+
+    result = asyncio.run(service.generate_reply(REVIEW, {"user_id": "store-1", "save_to_db": True}))
+    assert result["success"]
+    assert len(db.tables["reply_history"]) == 1
+    assert service.aggregator.pending
+
+
+def test_aggregate_skipped_when_history_save_fails():
+    class HistoryDown(FakeSupabase):
+        def table(self, name):
+            if name == "reply_history":
+                raise ConnectionError("down")
+            return super().table(name)
+
+    db = HistoryDown()
+    db.tables.update(cached_db(REVIEW).tables)
+    service = make_service(db)
+
+    asyncio.run(service.generate_reply(REVIEW, {"user_id": "store-1", "save_to_db": True}))
+
+    assert not service.aggregator.pending
+
+
+def test_flush_sends_pending_increments():
+    received = []
+    db = FakeSupabase({"increment_sentiment_summary": lambda db, params: received.extend(params["p_rows"])})
+    aggregator = SentimentAggregator(db)
+    aggregator.record("store-1", {"sentiment": "negative", "topics": ["서비스"]})
+
+    assert asyncio.run(aggregator.flush()) == 2
+    assert not aggregator.pending
+    assert {(row["dimension"], row["key"], row["count"]) for row in received} == {
+        ("sentiment", "negative", 1),
+        ("topic", "서비스", 1)
+    }
+
+
+def test_long_keys_are_truncated_to_column_length():
+    aggregator = SentimentAggregator()
+
+    aggregator.record("store-1", {"sentiment": "positive", "topics": ["가" * 300]})
+
+    topics = [key for (_, _, dimension, key) in aggregator.pending if dimension == "topic"]
+    assert topics == ["가" * MAX_KEY_LENGTH]
+
+
+def test_failing_store_is_retried_alone_then_dropped():
+    received = []
+
+    def increment(db, params):
+        if any(row["user_id"] == "deleted-store" for row in params["p_rows"]):
+            raise ValueError("violates foreign key constraint")
+        received.extend(params["p_rows"])
+
+    aggregator = SentimentAggregator(FakeSupabase({"increment_sentiment_summary": increment}))
+
+    for attempt in range(MAX_FLUSH_ATTEMPTS):
+        aggregator.record("store-1", {"sentiment": "positive"})
+        aggregator.record("deleted-store", {"sentiment": "negative"})
+        # 다른 매장 증분은 매번 반영됨
+        assert asyncio.run(aggregator.flush()) == 1
+
+    assert len(received) == MAX_FLUSH_ATTEMPTS
+    assert not aggregator.pending
+    assert aggregator.dropped == 1
+
+
+def summary_db() -> FakeSupabase:
+    db = FakeSupabase()
+    db.tables["sentiment_summary"] = [
+        {"user_id": "store-1", "bucket_date": "2026-01-01", "dimension": "sentiment", "key": "positive", "count": 3},
+        {"user_id": "store-1", "bucket_date": "2026-01-05", "dimension": "topic", "key": "서비스", "count": 2},
+        {"user_id": "store-1", "bucket_date": "2026-02-01", "dimension": "sentiment", "key": "negative", "count": 9},
+        {"user_id": "store-2", "bucket_date": "2026-01-02", "dimension": "sentiment", "key": "negative", "count": 4}
+    ]
+    return db
+
+
+def test_get_summary_filters_store_and_period():
+    aggregator = SentimentAggregator(summary_db())
+
+    summary = asyncio.run(aggregator.get_summary("store-1", date(2026, 1, 1), date(2026, 1, 31)))
+
+    assert summary["sentiment"] == {"positive": 3}
+    assert summary["topic"] == {"서비스": 2}
+    assert summary["daily"] == {"2026-01-01": {"positive": 3}}
+
+
+def test_get_summary_raises_when_table_unavailable():
+    class SummaryDown(FakeSupabase):
+        def table(self, name):
+            raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(SentimentAggregator(SummaryDown()).get_summary("store-1"))
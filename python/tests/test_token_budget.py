@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from fakes import FakeOpenAI, json_completion, make_completion
+from services.sentiment_analyzer import DEEP_MAX_TOKENS, DEEP_RETRY_MAX_TOKENS, SentimentAnalyzer
+from utils.token_budget import (
+    CORRECTION_BOUNDS,
+    CORRECTION_MIN_SAMPLES,
+    TokenEstimator,
+    estimate_messages_tokens,
+    estimate_tokens,
+)
+
+
+RECORDED_USAGE = os.path.join(os.path.dirname(__file__), "fixtures", "recorded_usage.jsonl")
+
+# capture_usage.py 로 수집한 실측값 기준 허용 오차
+MAX_MEAN_ABS_ERROR_RATE = 0.25
+
+MESSAGES = [
+    {"role": "system", "content": "당신은 고객 리뷰 분석 전문가입니다."},
+    {"role": "user", "content": "직원이 너무 불친절하고 웨이팅도 오래 걸렸어요."}
+]
+
+ANALYSIS_JSON = {
+    "sentiment": "negative",
+    "sentiment_strength": 0.8,
+    "topics": ["서비스"],
+    "keywords": ["불친절"],
+    "intent": "불만",
+    "reply_focus": ["사과"],
+    "reply_avoid": ["변명"],
+    "summary": "응대 불만"
+}
+
+
+def test_record_usage_error_rate():
+    estimator = TokenEstimator()
+    estimated = estimate_messages_tokens(MESSAGES)
+
+    record = estimator.record_usage(MESSAGES, {"prompt_tokens": estimated * 2, "completion_tokens": 10})
+
+    assert record == {"estimated": estimated, "actual": estimated * 2, "error_rate": 0.5}
+    assert estimator.accuracy()["mean_abs_error_rate"] == 0.5
+
+
+def test_single_outlier_does_not_move_correction():
+    estimator = TokenEstimator()
+    estimated = estimate_messages_tokens(MESSAGES)
+
+    estimator.record_usage(MESSAGES, {"prompt_tokens": estimated * 33, "completion_tokens": 10})
+
+    assert estimator.prompt_correction == 1.0
+    assert estimator.estimate_prompt(MESSAGES) == estimated
+
+
+def test_correction_is_clamped():
+    estimator = TokenEstimator()
+    estimated = estimate_messages_tokens(MESSAGES)
+
+    for _ in range(CORRECTION_MIN_SAMPLES):
+        estimator.record_usage(MESSAGES, {"prompt_tokens": estimated * 33, "completion_tokens": 10})
+
+    assert estimator.prompt_correction == CORRECTION_BOUNDS[1]
+
+
+def test_prompt_and_completion_corrections_are_separate():
+    estimator = TokenEstimator()
+    estimated = estimate_messages_tokens(MESSAGES)
+    completion = "응대 불만 요약입니다"
+
+    for _ in range(CORRECTION_MIN_SAMPLES):
+        estimator.record_usage(
+            MESSAGES,
+            {"prompt_tokens": int(estimated * 1.5), "completion_tokens": estimate_tokens(completion)},
+            completion
+        )
+
+    assert estimator.prompt_correction == pytest.approx(1.5, abs=0.05)
+    assert estimator.completion_correction == 1.0
+    assert estimator.estimate_completion_budget(100, 10, 1000, margin=1.0) == 90
+
+
+def test_estimate_usage_counts_actual_output_not_max_tokens():
+    estimator = TokenEstimator()
+
+    usage = estimator.estimate_usage(MESSAGES, "짧은 답글")
+    upper_bound = estimator.estimate_request_cost(MESSAGES, max_tokens=500)
+
+    assert usage["completion_tokens"] == estimate_tokens("짧은 답글")
+    assert upper_bound["completion_tokens"] == 500
+    assert usage["total_tokens"] < upper_bound["total_tokens"]
+
+
+@pytest.mark.skipif(not os.path.exists(RECORDED_USAGE), reason="capture_usage.py 로 실측값을 먼저 수집해야 함")
+def test_estimates_match_recorded_usage():
+    estimator = TokenEstimator()
+    with open(RECORDED_USAGE, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    for record in records:
+        estimator.record_usage(record["messages"], record["usage"], record["completion"])
+
+    accuracy = estimator.accuracy()
+    assert accuracy["samples"] == len(records)
+    assert accuracy["mean_abs_error_rate"] <= MAX_MEAN_ABS_ERROR_RATE
+
+
+def test_truncated_deep_analysis_is_retried():
+    usage = {"prompt_tokens": 300, "completion_tokens": 500}
+    client = FakeOpenAI([
+        make_completion('{"sentiment": "nega', finish_reason="length", usage=usage),
+        json_completion(ANALYSIS_JSON, usage={"prompt_tokens": 300, "completion_tokens": 120})
+    ])
+    analyzer = SentimentAnalyzer(None, openai_client=client)
+
+    ai_result, usage = asyncio.run(analyzer._request_deep_analysis(MESSAGES, DEEP_MAX_TOKENS))
+
+    assert ai_result["sentiment"] == "negative"
+    assert client.calls[1]["max_tokens"] == DEEP_RETRY_MAX_TOKENS
+    assert usage["prompt_tokens"] == 600
+    assert usage["completion_tokens"] == 620
+
+
+def test_deep_usage_without_response_usage_uses_output_text():
+    client = FakeOpenAI([json_completion(ANALYSIS_JSON)])
+    analyzer = SentimentAnalyzer(None, openai_client=client)
+
+    _, usage = asyncio.run(analyzer._request_deep_analysis(MESSAGES, DEEP_MAX_TOKENS))
+
+    assert usage["completion_tokens"] == estimate_tokens(json.dumps(ANALYSIS_JSON, ensure_ascii=False))
@@ -0,0 +1,55 @@
+from fakes import FakeSupabase
+from utils.usage_tracker import check_quota
+
+
+USER_ID = "user-1"
+
+
+def make_db(limits, today_requests=0, month_requests=0, month_tokens=0):
+    """008_create_usage_views.sql 의 RPC 반환 컬럼 그대로 흉내"""
+    db = FakeSupabase({
+        "get_today_usage": lambda db, params: [
+            {"requests": today_requests, "quota_limit": limits.get("daily_reply_limit"), "quota_remaining": 0}
+        ],
+        "get_current_month_usage": lambda db, params: [
+            {"requests": month_requests, "tokens": month_tokens, "cost": 0.0, "quota_limit": 0, "quota_remaining": 0}
+        ]
+    })
+    db.tables["usage_quotas"] = [{"user_id": USER_ID, **limits}]
+    return db
+
+
+def test_monthly_tokens_read_from_tokens_column():
+    db = make_db({"monthly_token_limit": 10000}, month_tokens=9500)
+
+    quota = check_quota(db, USER_ID, estimated_tokens=600)
+
+    assert quota["monthly_tokens"] == 9500
+    assert not quota["allowed"]
+    assert quota["reason"] == "월간 토큰 사용 한도(10,000)를 초과했습니다."
+
+
+def test_daily_reply_limit_counts_replies_in_request():
+    db = make_db({"daily_reply_limit": 100, "monthly_token_limit": 10000}, today_requests=98)
+
+    assert check_quota(db, USER_ID, estimated_tokens=100, replies=2)["allowed"]
+
+    quota = check_quota(db, USER_ID, estimated_tokens=100, replies=3)
+    assert not quota["allowed"]
+    assert quota["reason"] == "일일 답글 생성 한도(100개)를 초과했습니다."
+
+
+def test_monthly_reply_limit():
+    db = make_db({"daily_reply_limit": 100, "monthly_reply_limit": 1000}, month_requests=1000)
+
+    quota = check_quota(db, USER_ID, estimated_tokens=100)
+
+    assert not quota["allowed"]
+    assert quota["reason"] == "월간 답글 생성 한도(1000개)를 초과했습니다."
+
+
+def test_no_quota_row_allows():
+    db = make_db({})
+    db.tables["usage_quotas"] = []
+
+    assert check_quota(db, USER_ID, estimated_tokens=100)["allowed"]
@@ -2,6 +2,7 @@
 Supabase 데이터베이스 연결 유틸리티
 """
 
+import asyncio
 import os
 from supabase import create_client, Client
 from typing import Optional
@@ -24,3 +25,14 @@ def get_supabase_client() -> Client:
         _supabase_client = create_client(supabase_url, supabase_key)
 
     return _supabase_client
+
+
+async def execute_async(query):
+    """
+    동기 supabase 쿼리를 기본 스레드 풀에서 실행
+
+    supabase-py 2.3 동기 클라이언트의 execute() 는 HTTP 왕복 동안 블로킹되므로
+    async 엔드포인트에서는 이벤트 루프를 막지 않도록 이 함수로 실행한다.
+    동시 실행 수는 asyncio 기본 스레드 풀 크기(min(32, CPU + 4))로 제한된다.
+    """
+    return await asyncio.to_thread(query.execute)
@@ -0,0 +1,231 @@
+"""
+토큰 예산 추정 유틸리티
+tiktoken 없이 한국어 리뷰의 토큰 수를 가볍게 추정하여
+입력 길이 제한, max_tokens 산정, 비용 사전 계산에 사용
+"""
+
+import re
+from typing import Dict, List, Optional
+
+
+# OpenAI GPT-4o-mini 가격 (lib/usage-tracker.ts 와 동일)
+PRICING = {
+    "gpt-4o-mini": {
+        "input": 0.15 / 1_000_000,   # 1M 입력 토큰당 $0.15
+        "output": 0.60 / 1_000_000   # 1M 출력 토큰당 $0.60
+    }
+}
+
+# 문자 유형별 평균 토큰 비용 (gpt-4o 계열 o200k 토크나이저 기준 근사치)
+HANGUL_TOKENS_PER_CHAR = 0.9
+ASCII_TOKENS_PER_CHAR = 0.25
+OTHER_TOKENS_PER_CHAR = 1.0
+
+# 실측 보정 적용 조건
+CORRECTION_MIN_SAMPLES = 5
+CORRECTION_BOUNDS = (0.5, 2.0)
+
+# chat 메시지 포맷 오버헤드
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REQUEST = 3
+
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]")
+_ASCII_RE = re.compile(r"[A-Za-z0-9]")
+_SPACE_RE = re.compile(r"\s")
+_SENTENCE_RE = re.compile(r"[^.!?。\n]+[.!?。\n]*")
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트 토큰 수 추정"""
+    if not text:
+        return 0
+
+    hangul = len(_HANGUL_RE.findall(text))
+    ascii_chars = len(_ASCII_RE.findall(text))
+    spaces = len(_SPACE_RE.findall(text))
+    other = len(text) - hangul - ascii_chars - spaces
+
+    estimate = (
+        hangul * HANGUL_TOKENS_PER_CHAR +
+        ascii_chars * ASCII_TOKENS_PER_CHAR +
+        other * OTHER_TOKENS_PER_CHAR
+    )
+    return max(1, int(round(estimate)))
+
+
+def estimate_messages_tokens(messages: List[Dict]) -> int:
+    """chat 메시지 목록의 프롬프트 토큰 수 추정"""
+    total = TOKENS_PER_REQUEST
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + estimate_tokens(message.get("content", ""))
+    return total
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """예상 비용 계산 (USD)"""
+    pricing = PRICING.get(model, PRICING["gpt-4o-mini"])
+    return pricing["input"] * prompt_tokens + pricing["output"] * completion_tokens
+
+
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    """
+    토큰 예산을 넘는 텍스트를 문장 단위로 축약
+
+    리뷰는 앞부분(방문 맥락)과 뒷부분(결론/불만)에 핵심이 몰리므로
+    앞뒤 문장을 번갈아 남기고 가운데를 생략한다.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [s for s in _SENTENCE_RE.findall(text) if s.strip()]
+    marker = " … "
+    budget = max_tokens - estimate_tokens(marker)
+
+    head: List[str] = []
+    tail: List[str] = []
+    used = 0
+    left, right = 0, len(sentences) - 1
+    take_head = True
+
+    while left <= right:
+        sentence = sentences[left] if take_head else sentences[right]
+        cost = estimate_tokens(sentence)
+        if used + cost > budget:
+            break
+        used += cost
+        if take_head:
+            head.append(sentence)
+            left += 1
+        else:
+            tail.insert(0, sentence)
+            right -= 1
+        take_head = not take_head
+
+    if not head:
+        # 첫 문장조차 예산을 넘으면 글자 단위로 자르기
+        chars = max(1, int(budget / HANGUL_TOKENS_PER_CHAR))
+        return text[:chars].rstrip() + marker.rstrip()
+
+    return "".join(head).rstrip() + marker + "".join(tail).lstrip()
+
+
+class TokenEstimator:
+    """
+    토큰 추정기
+
+    실제 응답의 usage 값과 추정치를 비교해 정확도를 기록하고,
+    프롬프트/출력 각각의 누적 실측/추정 비율로 이후 추정치를 보정한다.
+    보정은 샘플이 CORRECTION_MIN_SAMPLES 개 이상일 때만 적용하며
+    이상치 한 건이 추정을 크게 흔들지 않도록 CORRECTION_BOUNDS 범위로 제한한다.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini"):
+        self.model = model
+        self.samples = 0
+        self.abs_error_total = 0.0
+        self.prompt_totals = {"estimated": 0, "actual": 0}
+        self.completion_totals = {"samples": 0, "estimated": 0, "actual": 0}
+
+    @property
+    def prompt_correction(self) -> float:
+        """프롬프트 실측/추정 보정 계수"""
+        return _bounded_ratio(self.samples, self.prompt_totals)
+
+    @property
+    def completion_correction(self) -> float:
+        """출력 실측/추정 보정 계수"""
+        return _bounded_ratio(self.completion_totals["samples"], self.completion_totals)
+
+    def estimate_prompt(self, messages: List[Dict]) -> int:
+        """보정이 적용된 프롬프트 토큰 추정"""
+        return int(round(estimate_messages_tokens(messages) * self.prompt_correction))
+
+    def estimate_completion_budget(
+        self,
+        expected_chars: int,
+        minimum: int,
+        maximum: int,
+        margin: float = 1.3
+    ) -> int:
+        """예상 출력 길이(한국어 글자 수)로 max_tokens 산정"""
+        expected = expected_chars * HANGUL_TOKENS_PER_CHAR * self.completion_correction * margin
+        return max(minimum, min(maximum, int(expected)))
+
+    def estimate_request_cost(self, messages: List[Dict], max_tokens: int) -> Dict:
+        """요청 전 비용 사전 계산 (쿼터 확인용 상한값: 출력은 max_tokens 전부 사용한다고 가정)"""
+        prompt_tokens = self.estimate_prompt(messages)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": max_tokens,
+            "total_tokens": prompt_tokens + max_tokens,
+            "estimated_cost": estimate_cost(self.model, prompt_tokens, max_tokens)
+        }
+
+    def estimate_usage(self, messages: List[Dict], completion_text: str) -> Dict:
+        """응답에 usage 가 없을 때 실제 출력 텍스트로 사용량 추정"""
+        prompt_tokens = self.estimate_prompt(messages)
+        completion_tokens = int(round(estimate_tokens(completion_text) * self.completion_correction))
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "estimated_cost": estimate_cost(self.model, prompt_tokens, completion_tokens)
+        }
+
+    def record_usage(self, messages: List[Dict], usage, completion_text: Optional[str] = None) -> Optional[Dict]:
+        """
+        응답 usage 와 추정치 비교 기록
+
+        Returns:
+            {"estimated": 120, "actual": 131, "error_rate": 0.084} 또는 usage 가 없으면 None
+        """
+        actual = _usage_value(usage, "prompt_tokens")
+        if not actual:
+            return None
+
+        estimated = estimate_messages_tokens(messages)
+        error_rate = abs(estimated - actual) / actual
+
+        self.samples += 1
+        self.prompt_totals["estimated"] += estimated
+        self.prompt_totals["actual"] += actual
+        self.abs_error_total += error_rate
+
+        actual_completion = _usage_value(usage, "completion_tokens")
+        if completion_text and actual_completion:
+            self.completion_totals["samples"] += 1
+            self.completion_totals["estimated"] += estimate_tokens(completion_text)
+            self.completion_totals["actual"] += actual_completion
+
+        return {
+            "estimated": estimated,
+            "actual": actual,
+            "error_rate": round(error_rate, 4)
+        }
+
+    def accuracy(self) -> Dict:
+        """누적 추정 정확도 요약"""
+        mean_error = self.abs_error_total / self.samples if self.samples else 0.0
+        return {
+            "samples": self.samples,
+            "mean_abs_error_rate": round(mean_error, 4),
+            "prompt_correction": round(self.prompt_correction, 4),
+            "completion_correction": round(self.completion_correction, 4)
+        }
+
+
+def _usage_value(usage, key: str) -> Optional[int]:
+    """usage 객체/딕셔너리에서 토큰 수 조회"""
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get(key)
+    return getattr(usage, key, None)
+
+
+def _bounded_ratio(samples: int, totals: Dict) -> float:
+    """샘플이 충분할 때만 실측/추정 비율 사용 (CORRECTION_BOUNDS 로 제한)"""
+    if samples < CORRECTION_MIN_SAMPLES or not totals["estimated"]:
+        return 1.0
+    low, high = CORRECTION_BOUNDS
+    return max(low, min(high, totals["actual"] / totals["estimated"]))
@@ -0,0 +1,97 @@
+"""
+API 사용량 추적 및 쿼터 확인 유틸리티
+lib/usage-tracker.ts 의 Python 대응 (api_usage_logs / usage_quotas 테이블 공유)
+"""
+
+from typing import Dict, Optional
+
+
+def check_quota(supabase_client, user_id: str, estimated_tokens: int, replies: int = 1) -> Dict:
+    """
+    요청 전 쿼터 확인 (lib/usage-tracker.ts checkQuota 대응)
+
+    오늘/이번 달 답글 수 + 이번 요청 답글 수가 daily_reply_limit / monthly_reply_limit 을,
+    이번 달 토큰 + 사전 계산한 예상 토큰(상한값)이 monthly_token_limit 을 넘으면 거부한다.
+    사용량은 get_today_usage / get_current_month_usage 의 requests / tokens 컬럼 기준.
+    조회 실패 시에는 사용자를 막지 않도록 허용한다 (usage-tracker.ts 와 동일).
+
+    Returns:
+        {"allowed": True, "daily_replies": 3, "monthly_replies": 40, "monthly_tokens": 1200,
+         "estimated_tokens": 950, "daily_reply_limit": 100, "monthly_reply_limit": 1000, "monthly_token_limit": 100000}
+    """
+    try:
+        quota = supabase_client.table("usage_quotas")\
+            .select("daily_reply_limit, monthly_reply_limit, monthly_token_limit")\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        if not quota.data:
+            return {"allowed": True, "estimated_tokens": estimated_tokens}
+        limits = quota.data[0]
+
+        today = supabase_client.rpc("get_today_usage", {"p_user_id": user_id}).execute()
+        month = supabase_client.rpc("get_current_month_usage", {"p_user_id": user_id}).execute()
+        daily_replies = (today.data[0].get("requests") or 0) if today.data else 0
+        monthly_replies = (month.data[0].get("requests") or 0) if month.data else 0
+        monthly_tokens = (month.data[0].get("tokens") or 0) if month.data else 0
+
+        result = {
+            "allowed": True,
+            "daily_replies": daily_replies,
+            "monthly_replies": monthly_replies,
+            "monthly_tokens": monthly_tokens,
+            "estimated_tokens": estimated_tokens,
+            "daily_reply_limit": limits.get("daily_reply_limit"),
+            "monthly_reply_limit": limits.get("monthly_reply_limit"),
+            "monthly_token_limit": limits.get("monthly_token_limit")
+        }
+
+        daily_limit = limits.get("daily_reply_limit")
+        monthly_reply_limit = limits.get("monthly_reply_limit")
+        token_limit = limits.get("monthly_token_limit")
+        if daily_limit and daily_replies + replies > daily_limit:
+            result["allowed"] = False
+            result["reason"] = f"일일 답글 생성 한도({daily_limit}개)를 초과했습니다."
+        elif monthly_reply_limit and monthly_replies + replies > monthly_reply_limit:
+            result["allowed"] = False
+            result["reason"] = f"월간 답글 생성 한도({monthly_reply_limit}개)를 초과했습니다."
+        elif token_limit and monthly_tokens + estimated_tokens > token_limit:
+            result["allowed"] = False
+            result["reason"] = f"월간 토큰 사용 한도({token_limit:,})를 초과했습니다."
+        return result
+    except Exception as e:
+        print(f"쿼터 조회 실패: {e}")
+        return {"allowed": True, "estimated_tokens": estimated_tokens}
+
+
+def log_api_usage(
+    supabase_client,
+    user_id: str,
+    endpoint: str,
+    result: Dict,
+    execution_time_ms: int,
+    error_message: Optional[str] = None,
+    api_type: str = "openai_chat"
+):
+    """
+    api_usage_logs 에 실제 사용량 기록
+
+    답글 요청은 "openai_chat", 요청과 별도로 실행된 분석 보완 호출은 "sentiment_analysis"
+    (답글 수 한도에는 openai_chat 만 포함, 토큰 한도에는 모두 포함 - migration 017)
+    """
+    try:
+        supabase_client.table("api_usage_logs").insert({
+            "user_id": user_id,
+            "api_type": api_type,
+            "endpoint": endpoint,
+            "model_used": result.get("model_used"),
+            "prompt_tokens": result.get("prompt_tokens", 0),
+            "completion_tokens": result.get("completion_tokens", 0),
+            "total_tokens": result.get("tokens_used", 0),
+            "estimated_cost": result.get("estimated_cost", 0.0),
+            "success": bool(result.get("success")),
+            "error_message": error_message,
+            "execution_time_ms": execution_time_ms
+        }).execute()
+    except Exception as e:
+        print(f"API 사용량 기록 실패: {e}")
@@ -0,0 +1,13 @@
+-- Migration 010: Cache Lifecycle Indexes
+-- 감정 분석 캐시 TTL 만료 / LFU 압축 / 워밍업 조회용 인덱스
+
+-- TTL 만료 조회 (last_used_at 이 없으면 created_at 기준)
+CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used ON sentiment_analysis_cache(last_used_at);
+CREATE INDEX IF NOT EXISTS idx_sentiment_cache_created ON sentiment_analysis_cache(created_at);
+
+-- 워밍업 후보 조회 (hit_count 상위)
+CREATE INDEX IF NOT EXISTS idx_sentiment_cache_hits ON sentiment_analysis_cache(hit_count DESC);
+
+-- Add comments
+COMMENT ON COLUMN sentiment_analysis_cache.hit_count IS 'Cache hits, combined with last_used_at recency for LFU compaction';
+COMMENT ON COLUMN sentiment_analysis_cache.last_used_at IS 'Last cache hit, used for TTL expiry';
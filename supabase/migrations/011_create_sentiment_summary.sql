@@ -0,0 +1,49 @@
+-- Migration 011: Create Sentiment Summary Table
+-- 매장별 감정/주제/이슈 키워드 증분 집계 테이블
+
+-- Sentiment Summary Table (per user, per day bucket)
+CREATE TABLE IF NOT EXISTS sentiment_summary (
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    bucket_date DATE NOT NULL,
+    dimension VARCHAR(20) NOT NULL, -- 'sentiment', 'topic', 'issue'
+    key VARCHAR(100) NOT NULL, -- 'positive', '맛/품질', '불친절'
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, bucket_date, dimension, key)
+);
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS idx_sentiment_summary_user_date ON sentiment_summary(user_id, bucket_date DESC);
+
+-- Batch increment function (called from AIServiceV2 aggregator flush)
+CREATE OR REPLACE FUNCTION increment_sentiment_summary(p_rows JSONB)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO sentiment_summary (user_id, bucket_date, dimension, key, count)
+    SELECT
+        (r->>'user_id')::UUID,
+        (r->>'bucket_date')::DATE,
+        r->>'dimension',
+        r->>'key',
+        (r->>'count')::INTEGER
+    FROM jsonb_array_elements(p_rows) AS r
+    ON CONFLICT (user_id, bucket_date, dimension, key)
+    DO UPDATE SET
+        count = sentiment_summary.count + EXCLUDED.count,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row Level Security
+ALTER TABLE sentiment_summary ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage sentiment summary" ON sentiment_summary
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- Add comments
+COMMENT ON TABLE sentiment_summary IS 'Incremental per-store sentiment/topic/issue counts by day, replaces reply_history scans for dashboards';
+COMMENT ON COLUMN sentiment_summary.dimension IS 'Aggregate dimension: sentiment, topic, issue';
+COMMENT ON COLUMN sentiment_summary.key IS 'Sentiment label, topic name or issue keyword';
@@ -0,0 +1,105 @@
+-- Migration 012: Create Refinement Queue
+-- 룰 기반으로 먼저 응답한 리뷰의 AI 정밀 분석 보완 큐
+
+-- Refinement Queue Table
+CREATE TABLE IF NOT EXISTS refinement_queue (
+    id BIGSERIAL PRIMARY KEY,
+    content_hash VARCHAR(64) UNIQUE NOT NULL,
+    content TEXT NOT NULL,
+    priority SMALLINT NOT NULL DEFAULT 1, -- 0: 정밀 분석 필요, 1: 룰 기반 충분
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- 'pending', 'running', 'done', 'failed'
+    attempts INTEGER NOT NULL DEFAULT 0,
+    meta JSONB, -- 완료 알림용 호출자 정보 (user_id 등)
+    last_error TEXT,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    claimed_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS idx_refinement_queue_claim ON refinement_queue(status, priority, available_at);
+
+-- Enqueue (bounded): returns TRUE when queued or re-queued
+CREATE OR REPLACE FUNCTION enqueue_refinement_job(
+    p_content_hash VARCHAR,
+    p_content TEXT,
+    p_priority SMALLINT,
+    p_meta JSONB,
+    p_max_size INTEGER
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_size INTEGER;
+    v_rows INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO v_size FROM refinement_queue WHERE status IN ('pending', 'running');
+    IF v_size >= p_max_size THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO refinement_queue (content_hash, content, priority, meta)
+    VALUES (p_content_hash, p_content, p_priority, p_meta)
+    ON CONFLICT (content_hash) DO UPDATE SET
+        priority = LEAST(refinement_queue.priority, EXCLUDED.priority),
+        status = CASE WHEN refinement_queue.status IN ('done', 'failed') THEN 'pending' ELSE refinement_queue.status END,
+        attempts = CASE WHEN refinement_queue.status IN ('done', 'failed') THEN 0 ELSE refinement_queue.attempts END,
+        meta = COALESCE(EXCLUDED.meta, refinement_queue.meta),
+        available_at = CASE WHEN refinement_queue.status IN ('done', 'failed') THEN NOW() ELSE refinement_queue.available_at END
+    WHERE refinement_queue.status IN ('done', 'failed') OR EXCLUDED.priority < refinement_queue.priority;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows > 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Claim jobs for a worker (stale running jobs are reclaimed after 5 minutes)
+CREATE OR REPLACE FUNCTION claim_refinement_jobs(p_limit INTEGER)
+RETURNS TABLE (
+    id BIGINT,
+    content_hash VARCHAR,
+    content TEXT,
+    priority SMALLINT,
+    attempts INTEGER,
+    meta JSONB
+) AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE refinement_queue q
+    SET status = 'running', claimed_at = NOW(), attempts = q.attempts + 1
+    WHERE q.id IN (
+        SELECT c.id FROM refinement_queue c
+        WHERE (c.status = 'pending' AND c.available_at <= NOW())
+           OR (c.status = 'running' AND c.claimed_at <= NOW() - INTERVAL '5 minutes')
+        ORDER BY c.priority, c.available_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING q.id, q.content_hash, q.content, q.priority, q.attempts, q.meta;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Fail a job: retry after backoff, or mark failed when p_retry_after_seconds is NULL
+CREATE OR REPLACE FUNCTION fail_refinement_job(p_id BIGINT, p_error TEXT, p_retry_after_seconds INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE refinement_queue
+    SET
+        status = CASE WHEN p_retry_after_seconds IS NULL THEN 'failed' ELSE 'pending' END,
+        available_at = NOW() + make_interval(secs => COALESCE(p_retry_after_seconds, 0)),
+        last_error = p_error
+    WHERE id = p_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row Level Security
+ALTER TABLE refinement_queue ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage refinement queue" ON refinement_queue
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- Add comments
+COMMENT ON TABLE refinement_queue IS 'Bounded queue of reviews served with rule-based analysis, refined by AI during idle capacity';
+COMMENT ON COLUMN refinement_queue.priority IS '0: needed deep analysis, 1: rule-based was sufficient';
@@ -0,0 +1,60 @@
+-- Migration 013: Cache Maintenance Functions
+-- 감정 분석 캐시 히트 카운트 원자적 증가 / TTL 만료 / LFU 압축을 DB 안에서 처리
+
+-- Atomic hit count (여러 워커의 동시 히트가 서로 덮어쓰지 않도록)
+CREATE OR REPLACE FUNCTION increment_cache_hit(p_content_hash VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE sentiment_analysis_cache
+    SET
+        hit_count = COALESCE(hit_count, 0) + 1,
+        last_used_at = NOW()
+    WHERE content_hash = p_content_hash;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TTL expiry: returns deleted row count
+CREATE OR REPLACE FUNCTION expire_sentiment_cache(p_ttl_days INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM sentiment_analysis_cache
+    WHERE COALESCE(last_used_at, created_at) < NOW() - make_interval(days => p_ttl_days);
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- LFU compaction: delete the lowest scoring rows above p_max_rows, returns deleted row count
+-- score = (hit_count + 1) * 0.5 ^ (days since last use / half life)
+CREATE OR REPLACE FUNCTION compact_sentiment_cache(p_max_rows INTEGER, p_half_life_days DOUBLE PRECISION)
+RETURNS INTEGER AS $$
+DECLARE
+    v_overflow INTEGER;
+    v_deleted INTEGER;
+BEGIN
+    SELECT COUNT(*) - p_max_rows INTO v_overflow FROM sentiment_analysis_cache;
+    IF v_overflow <= 0 THEN
+        RETURN 0;
+    END IF;
+
+    DELETE FROM sentiment_analysis_cache
+    WHERE id IN (
+        SELECT c.id FROM sentiment_analysis_cache c
+        ORDER BY
+            (COALESCE(c.hit_count, 0) + 1)
+            * power(0.5, GREATEST(EXTRACT(EPOCH FROM NOW() - COALESCE(c.last_used_at, c.created_at)), 0) / 86400.0 / p_half_life_days)
+        LIMIT v_overflow
+    );
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments
+COMMENT ON FUNCTION increment_cache_hit IS 'Atomically bumps hit_count/last_used_at on a cache hit';
+COMMENT ON FUNCTION expire_sentiment_cache IS 'Deletes cache rows unused for p_ttl_days';
+COMMENT ON FUNCTION compact_sentiment_cache IS 'Deletes lowest LFU score rows until at most p_max_rows remain';
@@ -0,0 +1,31 @@
+-- Migration 014: Reply History Batch Rescore
+-- 룰 기반 일괄 재채점 결과를 청크 단위로 reply_history 에 반영
+
+-- Batch update (called from bulk_rescorer.rescore_reply_history), returns updated row count
+CREATE OR REPLACE FUNCTION apply_reply_history_rescore(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE reply_history h
+    SET
+        sentiment = r.sentiment,
+        sentiment_strength = r.sentiment_strength,
+        topics = r.topics,
+        keywords = r.keywords
+    FROM jsonb_to_recordset(p_rows) AS r(
+        id UUID,
+        sentiment VARCHAR,
+        sentiment_strength DECIMAL,
+        topics JSONB,
+        keywords JSONB
+    )
+    WHERE h.id = r.id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments
+COMMENT ON FUNCTION apply_reply_history_rescore IS 'Applies a chunk of rule-based rescoring results to reply_history in one statement';
@@ -0,0 +1,62 @@
+-- Migration 015: Refinement Queue Retention
+-- 완료 작업은 삭제하고 최종 실패 작업은 보관 기간 후 정리 (큐 테이블이 무한히 커지지 않도록)
+
+-- Remove completed jobs left by the previous status = 'done' behaviour
+DELETE FROM refinement_queue WHERE status = 'done';
+
+-- Enqueue (bounded): TRUE when queued or already pending/running, FALSE only when the queue is full
+CREATE OR REPLACE FUNCTION enqueue_refinement_job(
+    p_content_hash VARCHAR,
+    p_content TEXT,
+    p_priority SMALLINT,
+    p_meta JSONB,
+    p_max_size INTEGER
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_size INTEGER;
+BEGIN
+    UPDATE refinement_queue
+    SET priority = LEAST(priority, p_priority)
+    WHERE content_hash = p_content_hash AND status IN ('pending', 'running');
+    IF FOUND THEN
+        RETURN TRUE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_size FROM refinement_queue WHERE status IN ('pending', 'running');
+    IF v_size >= p_max_size THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO refinement_queue (content_hash, content, priority, meta)
+    VALUES (p_content_hash, p_content, p_priority, p_meta)
+    ON CONFLICT (content_hash) DO UPDATE SET
+        priority = EXCLUDED.priority,
+        status = 'pending',
+        attempts = 0,
+        meta = COALESCE(EXCLUDED.meta, refinement_queue.meta),
+        last_error = NULL,
+        available_at = NOW()
+    WHERE refinement_queue.status = 'failed';
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Purge failed jobs older than the retention period, returns deleted row count
+CREATE OR REPLACE FUNCTION purge_refinement_jobs(p_retention_days INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM refinement_queue
+    WHERE status = 'failed' AND available_at < NOW() - make_interval(days => p_retention_days);
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments
+COMMENT ON COLUMN refinement_queue.status IS 'pending, running or failed (completed jobs are deleted)';
+COMMENT ON FUNCTION purge_refinement_jobs IS 'Deletes failed refinement jobs older than p_retention_days';
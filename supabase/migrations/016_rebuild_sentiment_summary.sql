@@ -0,0 +1,27 @@
+-- Migration 016: Rebuild Sentiment Summary
+-- 일괄 재채점 후 매장별 sentiment_summary 를 재채점 결과로 교체
+
+-- Replace one store's summary rows (called from bulk_rescorer.rescore_reply_history), returns inserted row count
+CREATE OR REPLACE FUNCTION replace_sentiment_summary(p_user_id UUID, p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_inserted INTEGER;
+BEGIN
+    DELETE FROM sentiment_summary WHERE user_id = p_user_id;
+
+    INSERT INTO sentiment_summary (user_id, bucket_date, dimension, key, count)
+    SELECT
+        p_user_id,
+        (r->>'bucket_date')::DATE,
+        r->>'dimension',
+        r->>'key',
+        (r->>'count')::INTEGER
+    FROM jsonb_array_elements(p_rows) AS r;
+
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+    RETURN v_inserted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments
+COMMENT ON FUNCTION replace_sentiment_summary IS 'Replaces a store''s sentiment_summary rows with counts rebuilt from rescored reply_history';
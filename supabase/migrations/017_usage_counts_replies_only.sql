@@ -0,0 +1,52 @@
+-- Migration 017: Count Only Reply Requests Against Reply Limits
+-- 백그라운드 분석 보완 사용량(api_type = 'sentiment_analysis')은 토큰/비용에만 포함
+
+-- Function to get current month usage for a user
+CREATE OR REPLACE FUNCTION get_current_month_usage(p_user_id UUID)
+RETURNS TABLE (
+    requests BIGINT,
+    tokens BIGINT,
+    cost NUMERIC,
+    quota_limit INTEGER,
+    quota_remaining INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        COUNT(*) FILTER (WHERE aul.api_type = 'openai_chat')::BIGINT as requests,
+        COALESCE(SUM(aul.total_tokens), 0)::BIGINT as tokens,
+        COALESCE(SUM(aul.estimated_cost), 0)::NUMERIC as cost,
+        COALESCE(uq.monthly_reply_limit, 1000) as quota_limit,
+        GREATEST(0, COALESCE(uq.monthly_reply_limit, 1000) - COUNT(*) FILTER (WHERE aul.api_type = 'openai_chat'))::INTEGER as quota_remaining
+    FROM api_usage_logs aul
+    LEFT JOIN usage_quotas uq ON uq.user_id = p_user_id
+    WHERE aul.user_id = p_user_id
+      AND DATE_TRUNC('month', aul.created_at) = DATE_TRUNC('month', NOW())
+    GROUP BY uq.monthly_reply_limit;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function to get today's usage for a user
+CREATE OR REPLACE FUNCTION get_today_usage(p_user_id UUID)
+RETURNS TABLE (
+    requests BIGINT,
+    quota_limit INTEGER,
+    quota_remaining INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        COUNT(*) FILTER (WHERE aul.api_type = 'openai_chat')::BIGINT as requests,
+        COALESCE(uq.daily_reply_limit, 100) as quota_limit,
+        GREATEST(0, COALESCE(uq.daily_reply_limit, 100) - COUNT(*) FILTER (WHERE aul.api_type = 'openai_chat'))::INTEGER as quota_remaining
+    FROM api_usage_logs aul
+    LEFT JOIN usage_quotas uq ON uq.user_id = p_user_id
+    WHERE aul.user_id = p_user_id
+      AND DATE(aul.created_at) = CURRENT_DATE
+    GROUP BY uq.daily_reply_limit;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments
+COMMENT ON FUNCTION get_current_month_usage IS 'Get current month usage for a user: reply requests (openai_chat) and tokens/cost of all calls';
+COMMENT ON FUNCTION get_today_usage IS 'Get today reply request count (openai_chat only) for a specific user';
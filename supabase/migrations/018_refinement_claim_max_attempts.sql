@@ -0,0 +1,39 @@
+-- Migration 018: Refinement Claim Respects Max Attempts
+-- 처리 중 멈춘 작업을 재할당할 때 max_attempts 를 넘긴 작업은 최종 실패 처리
+
+DROP FUNCTION IF EXISTS claim_refinement_jobs(INTEGER);
+
+-- Claim jobs for a worker (stale running jobs are reclaimed after 5 minutes, or failed once attempts reach p_max_attempts)
+CREATE OR REPLACE FUNCTION claim_refinement_jobs(p_limit INTEGER, p_max_attempts INTEGER)
+RETURNS TABLE (
+    id BIGINT,
+    content_hash VARCHAR,
+    content TEXT,
+    priority SMALLINT,
+    attempts INTEGER,
+    meta JSONB
+) AS $$
+BEGIN
+    UPDATE refinement_queue
+    SET status = 'failed', available_at = NOW(), last_error = 'visibility timeout'
+    WHERE status = 'running'
+      AND claimed_at <= NOW() - INTERVAL '5 minutes'
+      AND refinement_queue.attempts >= p_max_attempts;
+
+    RETURN QUERY
+    UPDATE refinement_queue q
+    SET status = 'running', claimed_at = NOW(), attempts = q.attempts + 1
+    WHERE q.id IN (
+        SELECT c.id FROM refinement_queue c
+        WHERE (c.status = 'pending' AND c.available_at <= NOW())
+           OR (c.status = 'running' AND c.claimed_at <= NOW() - INTERVAL '5 minutes')
+        ORDER BY c.priority, c.available_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING q.id, q.content_hash, q.content, q.priority, q.attempts, q.meta;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments
+COMMENT ON FUNCTION claim_refinement_jobs IS 'Claims up to p_limit refinement jobs; stale running jobs past p_max_attempts are marked failed instead of reclaimed';